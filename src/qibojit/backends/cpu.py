@@ -1,10 +1,15 @@
+import itertools
+import weakref
+
 import numpy as np
 from qibo.backends.numpy import NumpyBackend
-from qibo.config import log
-from qibo.gates.abstract import ParametrizedGate
-from qibo.gates.channels import ReadoutErrorChannel
+from qibo.config import log, raise_error
+from qibo.gates.abstract import ParametrizedGate, SpecialGate
+from qibo.gates.channels import Channel
+from qibo.gates.measurements import M
 from qibo.gates.special import FusedGate
 
+from qibojit.backends.fusion import MAX_FUSE_QUBITS, FusedMatrix, GateFuser, MultiSwap
 from qibojit.backends.matrices import CustomMatrices
 
 GATE_OPS = {
@@ -21,8 +26,29 @@ GATE_OPS = {
     "GeneralizedfSim": "apply_fsim",
 }
 
+KERNELS = (
+    "apply_gate",
+    "apply_x",
+    "apply_y",
+    "apply_z",
+    "apply_z_pow",
+    "apply_two_qubit_gate",
+    "apply_fsim",
+    "apply_swap",
+)
+
 
 class NumbaBackend(NumpyBackend):
+    MAX_FUSE_QUBITS = MAX_FUSE_QUBITS
+    # number of gate sequences whose fusion is kept by ``apply_gates``
+    FUSION_CACHE_SIZE = 16
+    # compile uncontrolled ``apply_gate`` kernels for each target and number
+    # of qubits, see :meth:`qibojit.backends.cpu.NumbaBackend.specialized_kernel`
+    SPECIALIZE_KERNELS = False
+    # largest number of qubits for which ``compile_circuit`` builds the
+    # full unitary, a ``2**n x 2**n`` matrix
+    DENSE_MAX_QUBITS = 8
+
     def __init__(self):
         super().__init__()
         import sys
@@ -63,10 +89,23 @@ class NumbaBackend(NumpyBackend):
             4: self.gates.apply_four_qubit_gate_kernel,
             5: self.gates.apply_five_qubit_gate_kernel,
         }
+        # kernels of one and two-qubit gates keyed by ``(op, controlled)``
+        self._kernel_table = {}
+        for op in KERNELS:
+            self._kernel_table[(op, False)] = getattr(gates, f"{op}_kernel")
+            self._kernel_table[(op, True)] = getattr(gates, f"multicontrol_{op}_kernel")
+        # qubit and target tensors are reused by all gates acting on the same qubits
+        self._qubits_cache = {}
+        self._targets_cache = {}
+        self._kernel_cache = {}
+        self._fusion_cache = {}
+        self._fused_matrices = weakref.WeakKeyDictionary()
+        # the affinity is left untouched, threads pinned with a NUMA policy
+        # apply to the whole process and are only released by ``set_threads``
         if sys.platform == "darwin":  # pragma: no cover
-            self.set_threads(psutil.cpu_count(logical=False))
+            self._set_num_threads(psutil.cpu_count(logical=False))
         else:
-            self.set_threads(len(psutil.Process().cpu_affinity()))
+            self._set_num_threads(len(psutil.Process().cpu_affinity()))
 
     def set_precision(self, precision):
         if precision != self.precision:
@@ -74,7 +113,31 @@ class NumbaBackend(NumpyBackend):
             if self.custom_matrices:
                 self.custom_matrices = CustomMatrices(self.dtype)
 
-    def set_threads(self, nthreads):
+    def set_threads(self, nthreads, numa_policy=None):
+        """Set the number of threads used by numba kernels.
+
+        Args:
+            nthreads (int): Number of threads.
+            numa_policy (str): If given, threads are pinned evenly across
+                NUMA nodes and new states are allocated following the given
+                policy, see :func:`qibojit.backends.numa.set_numa_policy`.
+                Only supported on Linux. If ``None`` the original affinity
+                of the threads is restored. Both the pinning and the policy
+                apply to all backends of the process.
+        """
+        import sys
+
+        if numa_policy is not None:
+            from qibojit.backends.numa import set_numa_policy
+
+            set_numa_policy(nthreads, numa_policy)
+        elif sys.platform == "linux":
+            from qibojit.backends.numa import restore_affinity
+
+            restore_affinity()
+        self._set_num_threads(nthreads)
+
+    def _set_num_threads(self, nthreads):
         import numba
 
         numba.set_num_threads(nthreads)
@@ -84,14 +147,25 @@ class NumbaBackend(NumpyBackend):
 
     # def to_numpy(self, x): Inherited from ``NumpyBackend``
 
+    def _apply_numa_policy(self, state):
+        """Bind the pages of a new state to the NUMA policy before first touch."""
+        from qibojit.backends.numa import interleave_memory, numa_policy
+
+        if numa_policy() == "interleave":
+            interleave_memory(state)
+
     def zero_state(self, nqubits):
         size = 2**nqubits
+        # ``np.empty`` does not touch the pages, so they are first written
+        # and placed on the local NUMA node by the parallel initialization
         state = np.empty((size,), dtype=self.dtype)
+        self._apply_numa_policy(state)
         return self.ops.initial_state_vector(state)
 
     def zero_density_matrix(self, nqubits):
         size = 2**nqubits
         state = np.empty((size, size), dtype=self.dtype)
+        self._apply_numa_policy(state)
         return self.ops.initial_density_matrix(state)
 
     # def plus_state(self, nqubits): Inherited from ``NumpyBackend``
@@ -102,17 +176,35 @@ class NumbaBackend(NumpyBackend):
 
     # def control_matrix(self, gate): Inherited from ``NumpyBackend``
 
-    def one_qubit_base(self, state, nqubits, target, kernel, gate, qubits):
+    def one_qubit_base(self, state, nqubits, target, kernel, gate, qubits, conj=False):
         ncontrols = len(qubits) - 1 if qubits is not None else 0
         m = nqubits - target - 1
         nstates = 1 << (nqubits - ncontrols - 1)
+        if self.SPECIALIZE_KERNELS and kernel == "apply_gate" and not ncontrols:
+            return self.specialized_kernel(kernel, m, nqubits)(state, gate, conj)
+        kernel = self._kernel_table[(kernel, bool(ncontrols))]
         if ncontrols:
-            kernel = getattr(self.gates, "multicontrol_{}_kernel".format(kernel))
-            return kernel(state, gate, qubits, nstates, m)
-        kernel = getattr(self.gates, "{}_kernel".format(kernel))
-        return kernel(state, gate, nstates, m)
-
-    def two_qubit_base(self, state, nqubits, target1, target2, kernel, gate, qubits):
+            return kernel(state, gate, qubits, nstates, m, conj)
+        return kernel(state, gate, nstates, m, conj)
+
+    def specialized_kernel(self, op, m, nqubits):
+        """One-qubit gate kernel compiled for fixed ``m`` and ``nqubits``.
+
+        Kernels are compiled the first time each ``(op, m, nqubits)`` is
+        requested and are then reused. Compilation takes a fraction of a
+        second per kernel, therefore specialization is enabled only when
+        ``SPECIALIZE_KERNELS`` is set, typically for circuits that are
+        executed many times.
+        """
+        key = (op, m, nqubits)
+        if key not in self._kernel_cache:
+            factory = getattr(self.gates, f"specialized_{op}_kernel")
+            self._kernel_cache[key] = factory(1 << (nqubits - 1), m)
+        return self._kernel_cache[key]
+
+    def two_qubit_base(
+        self, state, nqubits, target1, target2, kernel, gate, qubits, conj=False
+    ):
         ncontrols = len(qubits) - 2 if qubits is not None else 0
         if target1 > target2:
             swap_targets = True
@@ -123,43 +215,108 @@ class NumbaBackend(NumpyBackend):
             m1 = nqubits - target2 - 1
             m2 = nqubits - target1 - 1
         nstates = 1 << (nqubits - 2 - ncontrols)
+        kernel = self._kernel_table[(kernel, bool(ncontrols))]
         if ncontrols:
-            kernel = getattr(self.gates, "multicontrol_{}_kernel".format(kernel))
-            return kernel(state, gate, qubits, nstates, m1, m2, swap_targets)
-        kernel = getattr(self.gates, "{}_kernel".format(kernel))
-        return kernel(state, gate, nstates, m1, m2, swap_targets)
+            return kernel(state, gate, qubits, nstates, m1, m2, swap_targets, conj)
+        return kernel(state, gate, nstates, m1, m2, swap_targets, conj)
 
-    def multi_qubit_base(self, state, nqubits, targets, gate, qubits):
+    def multi_qubit_base(self, state, nqubits, targets, gate, qubits, conj=False):
+        if conj:
+            gate = np.conj(gate)
         if qubits is None:
             qubits = np.array(sorted(nqubits - q - 1 for q in targets), dtype="int32")
         nstates = 1 << (nqubits - len(qubits))
-        targets = np.array(
-            [1 << (nqubits - t - 1) for t in targets[::-1]], dtype="int64"
-        )
+        targets = self._create_targets_tensor(targets, nqubits)
         if len(targets) > 5:
             kernel = self.gates.apply_multi_qubit_gate_kernel
         else:
             kernel = self.multi_qubit_kernels.get(len(targets))
         return kernel(state, gate, qubits, nstates, targets)
 
-    @staticmethod
-    def _create_qubits_tensor(gate, nqubits):
+    def one_qubit_density_matrix_base(self, state, nqubits, target, gate):
+        """Apply an uncontrolled one-qubit gate to a flattened density matrix.
+
+        Both the gate on the rows and its conjugate on the columns are
+        applied in a single pass over the state.
+        """
+        m1 = nqubits - target - 1
+        m2 = 2 * nqubits - target - 1
+        nstates = 1 << (2 * nqubits - 2)
+        kernel = self.gates.apply_gate_density_matrix_kernel
+        return kernel(state, gate, nstates, m1, m2)
+
+    def multi_swap_base(self, state, nqubits, pairs):
+        qubits, masks, flips = self._create_swap_tensors(pairs, nqubits)
+        nfree = nqubits - len(qubits)
+        return self.gates.apply_multi_swap_kernel(state, qubits, masks, flips, nfree)
+
+    def _create_qubits_tensor(self, gate, nqubits):
         # TODO: Treat density matrices
-        qubits = [nqubits - q - 1 for q in gate.control_qubits]
-        qubits.extend(nqubits - q - 1 for q in gate.target_qubits)
-        return np.array(sorted(qubits), dtype="int32")
+        key = (gate.control_qubits, gate.target_qubits, nqubits)
+        if key not in self._qubits_cache:
+            qubits = [nqubits - q - 1 for q in gate.control_qubits]
+            qubits.extend(nqubits - q - 1 for q in gate.target_qubits)
+            self._qubits_cache[key] = np.array(sorted(qubits), dtype="int32")
+        return self._qubits_cache[key]
+
+    def _create_targets_tensor(self, targets, nqubits):
+        key = (tuple(targets), nqubits)
+        if key not in self._targets_cache:
+            self._targets_cache[key] = np.array(
+                [1 << (nqubits - t - 1) for t in targets[::-1]], dtype="int64"
+            )
+        return self._targets_cache[key]
+
+    def _create_swap_tensors(self, pairs, nqubits):
+        """Tensors used by ``apply_multi_swap_kernel`` to swap disjoint pairs of qubits.
+
+        Returns the swapped bits in increasing order and, for each pattern
+        of these bits whose first differing pair is ``(0, 1)``, the mask of
+        set bits and the mask of bits toggled to find the partner index.
+        """
+        key = (tuple(tuple(pair) for pair in pairs), nqubits)
+        if key not in self._targets_cache:
+            bits = [tuple(nqubits - q - 1 for q in pair) for pair in pairs]
+            masks, flips = [], []
+            for pattern in itertools.product(range(4), repeat=len(bits)):
+                mask, flip, canonical = 0, 0, False
+                for (m1, m2), values in zip(bits, pattern):
+                    b1, b2 = values >> 1, values & 1
+                    mask |= (b1 << m1) | (b2 << m2)
+                    if b1 != b2:
+                        if not flip:
+                            canonical = b1 == 0
+                        flip |= (1 << m1) | (1 << m2)
+                if canonical:
+                    masks.append(mask)
+                    flips.append(flip)
+            qubits = np.array(sorted(m for pair in bits for m in pair), dtype="int64")
+            self._targets_cache[key] = (
+                qubits,
+                np.array(masks, dtype="int64"),
+                np.array(flips, dtype="int64"),
+            )
+        return self._targets_cache[key]
 
     def _as_custom_matrix(self, gate):
         name = gate.__class__.__name__
         if isinstance(gate, ParametrizedGate):
             return getattr(self.custom_matrices, name)(*gate.parameters)
-        elif isinstance(gate, FusedGate):  # pragma: no cover
-            # fusion is tested in qibo tests
+        elif isinstance(gate, FusedGate):
             return self.asmatrix_fused(gate)
         else:
             return getattr(self.custom_matrices, name)
 
+    def asmatrix_fused(self, fgate):
+        fmatrix = self._fused_matrices.get(fgate)
+        if fmatrix is None or not fmatrix.matches(fgate):
+            fmatrix = FusedMatrix(fgate)
+            self._fused_matrices[fgate] = fmatrix
+        return fmatrix.matrix(self, fgate)
+
     def apply_gate(self, gate, state, nqubits):
+        if isinstance(gate, (list, tuple)):
+            return self.apply_gates(gate, state, nqubits)
         matrix = self._as_custom_matrix(gate)
         qubits = self._create_qubits_tensor(gate, nqubits)
         targets = gate.target_qubits
@@ -173,83 +330,138 @@ class NumbaBackend(NumpyBackend):
         else:
             return self.multi_qubit_base(state, nqubits, targets, matrix, qubits)
 
-    def apply_gate_density_matrix(self, gate, state, nqubits, inverse=False):
+    def _fuse(self, gates):
+        """Fuse a sequence of gates, reusing the result for repeated sequences."""
+        # the cache holds references to the gates, so that their ids are not
+        # reused by other objects while the entry exists
+        key = (self.MAX_FUSE_QUBITS,) + tuple(id(gate) for gate in gates)
+        if key not in self._fusion_cache:
+            if len(self._fusion_cache) >= self.FUSION_CACHE_SIZE:
+                del self._fusion_cache[next(iter(self._fusion_cache))]
+            queue = GateFuser(self.MAX_FUSE_QUBITS).fuse(gates)
+            self._fusion_cache[key] = (list(gates), queue)
+        return self._fusion_cache[key][1]
+
+    def apply_gates(self, gates, state, nqubits):
+        """Apply a sequence of gates to a state vector.
+
+        Consecutive gates acting on at most ``MAX_FUSE_QUBITS`` qubits are
+        fused to a single matrix and runs of SWAPs on disjoint qubits to a
+        single permutation, so that the state is traversed once per group
+        instead of once per gate. The fusion of the last ``FUSION_CACHE_SIZE``
+        sequences is kept, so that executing the same gates again only
+        updates the matrices of gates whose parameters changed.
+        """
+        state = self.cast(state)
+        for gate in self._fuse(gates):
+            if isinstance(gate, MultiSwap):
+                state = self.multi_swap_base(state, nqubits, gate.pairs)
+            else:
+                # measurements, channels and special gates are not fused and
+                # are applied with their own method
+                state = gate.apply(self, state, nqubits)
+        return state
+
+    def compile_circuit(self, gates, nqubits):
+        """Multiply a sequence of gates to a single dense unitary.
+
+        For small systems dispatching one kernel per gate costs more than the
+        arithmetic, so the circuit is applied with a single matrix-vector
+        product instead.
+
+        Args:
+            gates (list): Gates to apply, in order.
+            nqubits (int): Number of qubits of the state vector. Must not be
+                larger than ``DENSE_MAX_QUBITS``.
+
+        Returns:
+            A :class:`qibojit.backends.cpu.DenseCircuit` that applies all
+            ``gates`` when called. Parameters of parametrized gates can be
+            modified between calls.
+        """
+        if nqubits > self.DENSE_MAX_QUBITS:
+            raise_error(
+                ValueError,
+                f"Cannot compile circuit of {nqubits} qubits to a dense unitary, "
+                f"the maximum is {self.DENSE_MAX_QUBITS}.",
+            )
+        return DenseCircuit(self, gates, nqubits)
+
+    def _flatten_density_matrix(self, state):
+        """Cast a density matrix and return it together with a flat view.
+
+        Kernels update the flat view in place, so the two-dimensional array
+        can be returned as is instead of being reshaped after each update.
+        """
+        state = self.cast(state)
+        if not state.flags.c_contiguous:
+            state = state.copy()
+        return state, state.reshape(-1)
+
+    def apply_gate_density_matrix(self, gate, state, nqubits):
+        # the column side of the density matrix is updated with the conjugate
+        # gate, one and two-qubit kernels conjugate the elements they load
+        # instead of receiving a conjugated copy of the matrix, ``apply_y``
+        # uses ``conj(Y) = -Y`` and X, Z and SWAP are real
         name = gate.__class__.__name__
-        if name == "Y":
-            return self._apply_ygate_density_matrix(gate, state, nqubits)
-        if inverse:
-            # used to reset the state when applying channels
-            # see :meth:`qibojit.backend.NumpyBackend.apply_channel_density_matrix` below
-            matrix = np.linalg.inv(gate.asmatrix(self))
-            matrix = self.cast(matrix)
-        else:
-            matrix = self._as_custom_matrix(gate)
+        matrix = self._as_custom_matrix(gate)
         qubits = self._create_qubits_tensor(gate, nqubits)
         qubits_dm = qubits + nqubits
         targets = gate.target_qubits
         targets_dm = tuple(q + nqubits for q in targets)
 
-        state = self.cast(state)
-        shape = state.shape
+        state, flat = self._flatten_density_matrix(state)
         if len(targets) == 1:
             op = GATE_OPS.get(name, "apply_gate")
-            state = self.one_qubit_base(
-                state.ravel(), 2 * nqubits, *targets, op, matrix, qubits_dm
-            )
-            state = self.one_qubit_base(
-                state, 2 * nqubits, *targets_dm, op, np.conj(matrix), qubits
-            )
+            if op == "apply_gate" and len(qubits) == 1:
+                self.one_qubit_density_matrix_base(flat, nqubits, *targets, matrix)
+            else:
+                self.one_qubit_base(flat, 2 * nqubits, *targets, op, matrix, qubits_dm)
+                self.one_qubit_base(
+                    flat, 2 * nqubits, *targets_dm, op, matrix, qubits, conj=True
+                )
         elif len(targets) == 2:
             op = GATE_OPS.get(name, "apply_two_qubit_gate")
-            state = self.two_qubit_base(
-                state.ravel(), 2 * nqubits, *targets, op, matrix, qubits_dm
-            )
-            state = self.two_qubit_base(
-                state, 2 * nqubits, *targets_dm, op, np.conj(matrix), qubits
+            self.two_qubit_base(flat, 2 * nqubits, *targets, op, matrix, qubits_dm)
+            self.two_qubit_base(
+                flat, 2 * nqubits, *targets_dm, op, matrix, qubits, conj=True
             )
         else:
-            state = self.multi_qubit_base(
-                state.ravel(), 2 * nqubits, targets, matrix, qubits_dm
-            )
-            state = self.multi_qubit_base(
-                state, 2 * nqubits, targets_dm, np.conj(matrix), qubits
+            self.multi_qubit_base(flat, 2 * nqubits, targets, matrix, qubits_dm)
+            self.multi_qubit_base(
+                flat, 2 * nqubits, targets_dm, matrix, qubits, conj=True
             )
-        return np.reshape(state, shape)
-
-    def _apply_ygate_density_matrix(self, gate, state, nqubits):
-        matrix = self._as_custom_matrix(gate)
-        qubits = self._create_qubits_tensor(gate, nqubits)
-        qubits_dm = qubits + nqubits
-        targets = gate.target_qubits
-        targets_dm = tuple(q + nqubits for q in targets)
-        state = self.cast(state)
-        shape = state.shape
-        state = self.one_qubit_base(
-            state.ravel(), 2 * nqubits, *targets, "apply_y", matrix, qubits_dm
-        )
-        # force using ``apply_gate`` kernel so that conjugate is properly applied
-        state = self.one_qubit_base(
-            state, 2 * nqubits, *targets_dm, "apply_gate", np.conj(matrix), qubits
-        )
-        return np.reshape(state, shape)
+        return state
 
     # def apply_channel(self, gate): Inherited from ``NumpyBackend``
 
+    def _axpy(self, a, x, y):
+        """Update ``y += a * x`` in place with BLAS ``axpy``."""
+        from scipy.linalg.blas import get_blas_funcs
+
+        axpy = get_blas_funcs("axpy", (x, y))
+        y_flat = y.reshape(-1)
+        result = axpy(x.reshape(-1), y_flat, a=a)
+        # ``axpy`` works on a copy if ``y`` is not contiguous or its type
+        # differs from the type of the routine
+        if result is not y_flat or not y.flags.c_contiguous:
+            y[...] = result.reshape(y.shape)
+        return y
+
     def apply_channel_density_matrix(self, channel, state, nqubits):
-        state = self.cast(state)
-        if isinstance(channel, ReadoutErrorChannel) is True:
-            state_copy = self.cast(state, copy=True)
+        state, _ = self._flatten_density_matrix(state)
         new_state = (1 - channel.coefficient_sum) * state
+        # each term is independent, so it is applied to a copy of the
+        # original state instead of undoing the gate with its inverse,
+        # the same buffer is reused for all terms
+        term = None
         for coeff, gate in zip(channel.coefficients, channel.gates):
-            state = self.apply_gate_density_matrix(gate, state, nqubits)
-            new_state += coeff * state
-            # reset the state
-            if isinstance(channel, ReadoutErrorChannel) is True:
-                state = self.cast(state_copy, copy=True)
+            if term is None:
+                term = self.cast(state, copy=True)
             else:
-                state = self.apply_gate_density_matrix(
-                    gate, state, nqubits, inverse=True
-                )
+                term[...] = state
+            term = self.apply_gate_density_matrix(gate, term, nqubits)
+            self._axpy(coeff, term, new_state)
         return new_state
 
     def collapse_state(self, state, qubits, shot, nqubits, normalize=True):
@@ -261,12 +473,10 @@ class NumbaBackend(NumpyBackend):
             return self.ops.collapse_state(state, qubits, int(shot), nqubits)
 
     def collapse_density_matrix(self, state, qubits, shot, nqubits, normalize=True):
-        state = self.cast(state)
-        shape = state.shape
+        state, flat = self._flatten_density_matrix(state)
         dm_qubits = [q + nqubits for q in qubits]
-        state = self.collapse_state(state.ravel(), dm_qubits, shot, 2 * nqubits, False)
-        state = self.collapse_state(state, qubits, shot, 2 * nqubits, False)
-        state = self.np.reshape(state, shape)
+        self.collapse_state(flat, dm_qubits, shot, 2 * nqubits, False)
+        self.collapse_state(flat, qubits, shot, 2 * nqubits, False)
         if normalize:
             state = state / self.np.trace(state)
         return state
@@ -301,3 +511,95 @@ class NumbaBackend(NumpyBackend):
     # def calculate_frequencies(self, samples): Inherited from ``NumpyBackend``
 
     # def assert_allclose(self, value, target, rtol=1e-7, atol=0.0): Inherited from ``NumpyBackend``
+
+
+class DenseCircuit:
+    """Sequence of gates multiplied to the dense unitary of the whole circuit.
+
+    The unitary is obtained by applying the gates to the identity, viewed as
+    a state of ``2 * nqubits`` qubits whose first ``nqubits`` qubits index
+    the rows. Changes of parameters are detected by the identity of the
+    ``parameters`` tuple of each parametrized gate, which is replaced
+    whenever parameters are assigned. Building the unitary costs as much as
+    applying the gates to ``2^nqubits`` states, so after a change the gates
+    are applied one by one and the unitary is rebuilt only once the same
+    parameters are used in two consecutive calls.
+
+    Args:
+        backend (:class:`qibojit.backends.cpu.NumbaBackend`): Backend used to
+            build the unitary.
+        gates (list): Gates to apply, in order.
+        nqubits (int): Number of qubits of the state vector.
+    """
+
+    def __init__(self, backend, gates, nqubits):
+        self.backend = backend
+        self.gates = list(gates)
+        self.nqubits = nqubits
+        self.parametrized = []
+        for gate in self.gates:
+            special = isinstance(gate, SpecialGate) and not isinstance(gate, FusedGate)
+            if special or isinstance(gate, (M, Channel)):
+                raise_error(
+                    ValueError,
+                    f"Cannot compile {gate.__class__.__name__} to a dense unitary.",
+                )
+            members = gate.gates if isinstance(gate, FusedGate) else [gate]
+            self.parametrized.extend(
+                g for g in members if isinstance(g, ParametrizedGate)
+            )
+        self.parameters = self._parameters()
+        self.unitary = self._build_unitary()
+        # parameters used in the previous call, if the unitary is outdated
+        self.pending = None
+
+    def _parameters(self):
+        return [gate.parameters for gate in self.parametrized]
+
+    @staticmethod
+    def _same_parameters(new, old):
+        return old is not None and all(x is y for x, y in zip(new, old))
+
+    def _build_unitary(self):
+        size = 2**self.nqubits
+        identity = np.eye(size, dtype=self.backend.dtype).ravel()
+        unitary = self.backend.apply_gates(self.gates, identity, 2 * self.nqubits)
+        return unitary.reshape(size, size)
+
+    def _update_unitary(self):
+        """Check whether the unitary can be used with the current parameters.
+
+        Returns:
+            ``True`` if the unitary is up to date after the call, ``False``
+            if the gates should be applied one by one instead.
+        """
+        parameters = self._parameters()
+        if self._same_parameters(parameters, self.parameters):
+            return True
+        if self._same_parameters(parameters, self.pending):
+            self.parameters = parameters
+            self.unitary = self._build_unitary()
+            self.pending = None
+            return True
+        self.pending = parameters
+        return False
+
+    def __call__(self, initial_state=None):
+        """Apply the compiled gates.
+
+        Args:
+            initial_state: State vector to apply the gates to. If ``None``
+                the gates are applied to the zero state.
+
+        Returns:
+            The final state vector as a new array.
+        """
+        if self._update_unitary():
+            if initial_state is None:
+                return self.unitary[:, 0].copy()
+            return self.unitary @ self.backend.cast(initial_state).ravel()
+        if initial_state is None:
+            state = self.backend.zero_state(self.nqubits)
+        else:
+            state = self.backend.cast(initial_state, copy=True).ravel()
+        return self.backend.apply_gates(self.gates, state, self.nqubits)
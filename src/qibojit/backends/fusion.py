@@ -0,0 +1,202 @@
+from itertools import islice
+
+import numpy as np
+from qibo.gates.abstract import ParametrizedGate, SpecialGate
+from qibo.gates.channels import Channel
+from qibo.gates.measurements import M
+from qibo.gates.special import FusedGate
+
+# fused gates of two qubits are applied with the two-qubit kernel, larger
+# fused gates need the generic multi-qubit kernels which cost more per
+# amplitude than the sweeps they save
+MAX_FUSE_QUBITS = 2
+
+
+class MultiSwap:
+    """Group of SWAP gates with disjoint targets applied as a single permutation.
+
+    Args:
+        gates (list): :class:`qibo.gates.SWAP` gates without controls that
+            act on pairwise disjoint qubits.
+    """
+
+    def __init__(self, gates):
+        self.gates = list(gates)
+        self.pairs = tuple(gate.target_qubits for gate in self.gates)
+
+
+class FusedMatrix:
+    """Matrix of a :class:`qibo.gates.special.FusedGate` built from its gates.
+
+    The matrix of each gate is extended to all target qubits of the fused
+    gate with a precomputed gather index instead of Kronecker products and
+    transpositions. Products of consecutive gates without parameters are
+    computed once and the matrices of parametrized gates are computed again
+    only when their ``parameters`` are replaced.
+
+    Args:
+        fgate (:class:`qibo.gates.special.FusedGate`): Fused gate.
+    """
+
+    def __init__(self, fgate):
+        self.targets = tuple(fgate.target_qubits)
+        self.ngates = len(fgate.gates)
+        self.dtype = None
+        # ``[index of the gate, gather index, parameters, matrix]`` for gates
+        # with parameters and ``[None, None, None, matrix]`` for products of
+        # gates without parameters, in the order they are applied
+        self.factors = []
+        self.result = None
+
+    def matches(self, fgate):
+        """Check if ``fgate`` was not modified since this object was created."""
+        return (
+            len(fgate.gates) == self.ngates
+            and tuple(fgate.target_qubits) == self.targets
+        )
+
+    def gather_index(self, qubits):
+        """Index that extends the matrix of a gate acting on ``qubits``.
+
+        The ravelled gate matrix padded with a single zero, indexed with the
+        returned array, gives the matrix acting on all target qubits.
+        """
+        rank = len(self.targets)
+        k = len(qubits)
+        indices = np.arange(2**rank)
+        sub, mask = 0, 0
+        for a, q in enumerate(qubits):
+            shift = rank - 1 - self.targets.index(q)
+            sub = sub + (((indices >> shift) & 1) << (k - 1 - a))
+            mask |= 1 << shift
+        rest = indices & ~mask
+        index = (sub[:, np.newaxis] << k) + sub[np.newaxis, :]
+        return np.where(rest[:, np.newaxis] == rest[np.newaxis, :], index, 4**k)
+
+    @staticmethod
+    def _extend(backend, gate, index):
+        matrix = np.ravel(backend.to_numpy(gate.asmatrix(backend)))
+        return np.concatenate((matrix, np.zeros(1, dtype=matrix.dtype)))[index]
+
+    def _build(self, backend, fgate):
+        self.dtype = backend.dtype
+        self.factors = []
+        self.result = None
+        constant = None
+        for i, gate in enumerate(fgate.gates):
+            index = self.gather_index(gate.qubits)
+            if isinstance(gate, ParametrizedGate):
+                if constant is not None:
+                    self.factors.append([None, None, None, constant])
+                    constant = None
+                self.factors.append([i, index, None, None])
+            else:
+                matrix = self._extend(backend, gate, index)
+                constant = matrix if constant is None else matrix @ constant
+        if constant is not None:
+            self.factors.append([None, None, None, constant])
+
+    def matrix(self, backend, fgate):
+        """Multiply the matrices of the gates of ``fgate``."""
+        if self.dtype != backend.dtype:
+            self._build(backend, fgate)
+        for factor in self.factors:
+            i, index, parameters, _ = factor
+            if i is not None and fgate.gates[i].parameters is not parameters:
+                # the setter of ``parameters`` always creates a new tuple
+                factor[2] = fgate.gates[i].parameters
+                factor[3] = self._extend(backend, fgate.gates[i], index)
+                self.result = None
+        if self.result is None:
+            result = self.factors[0][3]
+            for factor in self.factors[1:]:
+                result = factor[3] @ result
+            self.result = result.astype(self.dtype, copy=False)
+        return self.result
+
+
+class GateFuser:
+    """Greedy fusion of consecutive gates used by ``apply_gates``.
+
+    Gates are walked in order and multiplied into a single
+    :class:`qibo.gates.special.FusedGate` as long as the union of their
+    qubits does not exceed ``max_qubits``. The resulting fused gate is
+    then applied with a single sweep over the state instead of one sweep
+    per gate. Runs of SWAP gates acting on disjoint qubits are grouped to a
+    :class:`qibojit.backends.fusion.MultiSwap` instead.
+
+    Args:
+        max_qubits (int): Maximum number of qubits in each fused gate.
+    """
+
+    def __init__(self, max_qubits=MAX_FUSE_QUBITS):
+        self.max_qubits = max_qubits
+
+    @staticmethod
+    def can_fuse(gate):
+        """Check if a gate can participate in fusion."""
+        if isinstance(gate, (M, SpecialGate, Channel)):
+            return False
+        # ``asmatrix`` ignores the control qubits added via ``controlled_by``
+        return not gate.is_controlled_by and len(gate.qubits) <= 2
+
+    @staticmethod
+    def _swap_run(gates, start):
+        """Consecutive SWAP gates with disjoint targets starting from ``start``."""
+        swaps, qubits = [], set()
+        for gate in islice(gates, start, None):
+            if gate.__class__.__name__ != "SWAP" or gate.is_controlled_by:
+                break
+            if qubits & set(gate.target_qubits):
+                break
+            swaps.append(gate)
+            qubits |= set(gate.target_qubits)
+        return swaps
+
+    @staticmethod
+    def _flush(fgate):
+        if fgate is None:
+            return []
+        if len(fgate.gates) == 1:
+            # keep the original gate so that specialized kernels are used
+            return fgate.gates
+        return [fgate]
+
+    def fuse(self, gates):
+        """Group consecutive gates into :class:`qibo.gates.special.FusedGate`.
+
+        Args:
+            gates (list): Gates to fuse, in the order they are applied.
+
+        Returns:
+            List of gates equivalent to ``gates`` where groups of fusable
+            gates were replaced by a single ``FusedGate`` and runs of
+            disjoint SWAPs by a single ``MultiSwap``.
+        """
+        gates = list(gates)
+        queue = []
+        fgate = None
+        i = 0
+        while i < len(gates):
+            gate = gates[i]
+            swaps = self._swap_run(gates, i)
+            if len(swaps) > 1:
+                queue.extend(self._flush(fgate))
+                queue.append(MultiSwap(swaps))
+                fgate = None
+                i += len(swaps)
+                continue
+            i += 1
+            if not self.can_fuse(gate):
+                queue.extend(self._flush(fgate))
+                queue.append(gate)
+                fgate = None
+            elif fgate is not None and (
+                len(fgate.qubit_set | set(gate.qubits)) <= self.max_qubits
+            ):
+                fgate.append(gate)
+            else:
+                queue.extend(self._flush(fgate))
+                fgate = FusedGate.from_gate(gate)
+        queue.extend(self._flush(fgate))
+        return queue
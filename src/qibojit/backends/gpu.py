@@ -1,8 +1,11 @@
+import weakref
+
 import numpy as np
 from qibo.backends.numpy import NumpyBackend
 from qibo.config import log, raise_error
+from qibo.gates.abstract import ParametrizedGate, SpecialGate
 
-from qibojit.backends.cpu import NumbaBackend
+from qibojit.backends.cpu import KERNELS, NumbaBackend
 from qibojit.backends.matrices import CuQuantumMatrices, CustomMatrices
 
 
@@ -11,6 +14,13 @@ class CupyBackend(NumbaBackend):  # pragma: no cover
 
     DEFAULT_BLOCK_SIZE = 1024
     MAX_NUM_TARGETS = 7
+    # number of slots and elements per slot of the pinned buffer
+    # used to upload gate matrices of one and two qubit gates
+    MATRIX_BUFFER_SLOTS = 64
+    MATRIX_BUFFER_SIZE = 16
+    # multi-qubit gate matrices up to this size are loaded to shared memory
+    # once per block, which is the static shared memory available by default
+    MAX_SHARED_GATE_BYTES = 48 * 1024
 
     def __init__(self):
         NumpyBackend.__init__(self)
@@ -50,43 +60,69 @@ class CupyBackend(NumbaBackend):  # pragma: no cover
 
         self.cp = cp
         self.is_hip = cupy_backends.cuda.api.runtime.is_hip
-        self.KERNELS = (
+        self.KERNELS = KERNELS
+        # kernels that are also compiled with ``-DCONJ`` to apply the
+        # conjugate gate, the rest act with real matrices
+        self.CONJ_KERNELS = (
             "apply_gate",
-            "apply_x",
             "apply_y",
-            "apply_z",
             "apply_z_pow",
             "apply_two_qubit_gate",
             "apply_fsim",
-            "apply_swap",
         )
 
         # load core kernels
         self.gates = {}
         from qibojit.custom_operators import raw_kernels
 
-        def kernel_loader(name, ktype):
+        def kernel_loader(name, ktype, conj=False):
             code = getattr(raw_kernels, name)
             code = code.replace("T", f"thrust::complex<{ktype}>")
-            gate = cp.RawKernel(code, name, ("--std=c++11",))
-            self.gates[f"{name}_{ktype}"] = gate
+            if conj:
+                gate = cp.RawKernel(code, name, ("--std=c++11", "-DCONJ"))
+                self.gates[f"{name}_conj_{ktype}"] = gate
+            else:
+                gate = cp.RawKernel(code, name, ("--std=c++11",))
+                self.gates[f"{name}_{ktype}"] = gate
 
         for ktype in ("float", "double"):
             for name in self.KERNELS:
                 kernel_loader(f"{name}_kernel", ktype)
                 kernel_loader(f"multicontrol_{name}_kernel", ktype)
+            for name in self.CONJ_KERNELS:
+                kernel_loader(f"{name}_kernel", ktype, conj=True)
+                kernel_loader(f"multicontrol_{name}_kernel", ktype, conj=True)
+            kernel_loader("apply_multi_swap_kernel", ktype)
+            kernel_loader("apply_gate_density_matrix_kernel", ktype)
             kernel_loader("collapse_state_kernel", ktype)
             kernel_loader("initial_state_kernel", ktype)
 
+        # kernels of one and two-qubit gates keyed by
+        # ``(op, controlled, conj, ktype)``, real gates are their own conjugate
+        self._kernel_table = {}
+        for ktype in ("float", "double"):
+            for name in self.KERNELS:
+                for controlled, prefix in ((False, ""), (True, "multicontrol_")):
+                    kernel = self.gates[f"{prefix}{name}_kernel_{ktype}"]
+                    conj_kernel = self.gates.get(
+                        f"{prefix}{name}_kernel_conj_{ktype}", kernel
+                    )
+                    self._kernel_table[(name, controlled, False, ktype)] = kernel
+                    self._kernel_table[(name, controlled, True, ktype)] = conj_kernel
+
         # load multiqubit kernels
         name = "apply_multi_qubit_gate_kernel"
+        itemsize = {"float": 8, "double": 16}
         for ntargets in range(3, self.MAX_NUM_TARGETS + 1):
             for ktype in ("float", "double"):
                 code = getattr(raw_kernels, name)
                 code = code.replace("T", f"thrust::complex<{ktype}>")
                 code = code.replace("nsubstates", str(2**ntargets))
                 code = code.replace("MAX_BLOCK_SIZE", str(self.DEFAULT_BLOCK_SIZE))
-                gate = cp.RawKernel(code, name, ("--std=c++11",))
+                options = ("--std=c++11",)
+                if 4**ntargets * itemsize[ktype] <= self.MAX_SHARED_GATE_BYTES:
+                    options += ("-DSHARED_MEM",)
+                gate = cp.RawKernel(code, name, options)
                 self.gates[f"{name}_{ktype}_{ntargets}"] = gate
 
         # load numba op for measuring frequencies
@@ -97,6 +133,20 @@ class CupyBackend(NumbaBackend):  # pragma: no cover
         # number of available GPUs (for multigpu)
         self.ngpus = cp.cuda.runtime.getDeviceCount()
 
+        # pinned staging buffers for gate matrices, one per device and dtype
+        import threading
+
+        self._matrix_buffers = {}
+        self._matrix_lock = threading.Lock()
+
+        # device tensors are cached per GPU, see ``_create_qubits_tensor``
+        self._qubits_cache = {}
+        self._targets_cache = {}
+        self._matrix_cache = {}
+        # fused gates are multiplied on the host, see ``NumbaBackend.apply_gates``
+        self._fusion_cache = {}
+        self._fused_matrices = weakref.WeakKeyDictionary()
+
     def set_precision(self, precision):
         super().set_precision(precision)
         if self.dtype == "complex128":
@@ -125,11 +175,16 @@ class CupyBackend(NumbaBackend):  # pragma: no cover
             return cls(x, dtype=dtype)
         elif isinstance(x, self.cp.ndarray) and copy:
             return self.cp.copy(self.cp.asarray(x, dtype=dtype))
+        elif isinstance(x, self.cp.ndarray) and x.dtype == dtype:
+            return x
         else:
             return self.cp.asarray(x, dtype=dtype)
 
     def to_numpy(self, x):
         if isinstance(x, self.cp.ndarray):
+            # kernels are launched asynchronously so wait for pending
+            # updates before copying the array to host
+            self.cp.cuda.get_current_stream().synchronize()
             return x.get()
         elif self.sparse.issparse(x):
             return x.toarray().get()
@@ -142,24 +197,26 @@ class CupyBackend(NumbaBackend):  # pragma: no cover
 
     def zero_state(self, nqubits):
         n = 1 << nqubits
-        kernel = self.gates.get(f"initial_state_kernel_{self.kernel_type}")
-        state = self.cp.zeros(n, dtype=self.dtype)
-        kernel((1,), (1,), [state])
-        self.cp.cuda.stream.get_current_stream().synchronize()
-        return state
+        # memory is served by the cupy memory pool, so that states created
+        # repeatedly with the same size do not call ``cudaMalloc``
+        state = self.cp.empty(n, dtype=self.dtype)
+        return self._initial_state(state)
 
     def zero_density_matrix(self, nqubits):
         n = 1 << nqubits
+        state = self.cp.empty(n * n, dtype=self.dtype)
+        return self._initial_state(state).reshape((n, n))
+
+    def _initial_state(self, state):
+        """Write the computational basis state ``|0...0>`` to a flat array."""
         kernel = self.gates.get(f"initial_state_kernel_{self.kernel_type}")
-        state = self.cp.zeros(n * n, dtype=self.dtype)
-        kernel((1,), (1,), [state])
-        self.cp.cuda.stream.get_current_stream().synchronize()
-        return state.reshape((n, n))
+        nblocks, block_size = self.calculate_blocks(len(state))
+        kernel((nblocks,), (block_size,), (state, len(state)))
+        return state
 
     def identity_density_matrix(self, nqubits, normalize: bool = True):
         n = 1 << nqubits
         state = self.cp.eye(n, dtype=self.dtype)
-        self.cp.cuda.stream.get_current_stream().synchronize()
         if normalize:
             state /= 2**nqubits
         return state.reshape((n, n))
@@ -193,7 +250,7 @@ class CupyBackend(NumbaBackend):  # pragma: no cover
             block_size = nstates
         return nblocks, block_size
 
-    def one_qubit_base(self, state, nqubits, target, kernel, gate, qubits):
+    def one_qubit_base(self, state, nqubits, target, kernel, gate, qubits, conj=False):
         ncontrols = len(qubits) - 1 if qubits is not None else 0
         m = nqubits - target - 1
         tk = 1 << m
@@ -203,18 +260,19 @@ class CupyBackend(NumbaBackend):  # pragma: no cover
         else:
             args = (state, tk, m, gate)
 
+        kernel = self._kernel_table[
+            (kernel, bool(ncontrols), bool(conj), self.kernel_type)
+        ]
         if ncontrols:
-            kernel = self.gates.get(f"multicontrol_{kernel}_kernel_{self.kernel_type}")
             args += (qubits, ncontrols + 1)
-        else:
-            kernel = self.gates.get(f"{kernel}_kernel_{self.kernel_type}")
 
         nblocks, block_size = self.calculate_blocks(nstates)
         kernel((nblocks,), (block_size,), args)
-        self.cp.cuda.stream.get_current_stream().synchronize()
         return state
 
-    def two_qubit_base(self, state, nqubits, target1, target2, kernel, gate, qubits):
+    def two_qubit_base(
+        self, state, nqubits, target1, target2, kernel, gate, qubits, conj=False
+    ):
         ncontrols = len(qubits) - 2 if qubits is not None else 0
         if target1 > target2:
             m1 = nqubits - target1 - 1
@@ -234,19 +292,30 @@ class CupyBackend(NumbaBackend):  # pragma: no cover
             args = (state, tk1, tk2, m1, m2, uk1, uk2, gate)
             assert state.dtype == args[-1].dtype
 
+        kernel = self._kernel_table[
+            (kernel, bool(ncontrols), bool(conj), self.kernel_type)
+        ]
         if ncontrols:
-            kernel = self.gates.get(f"multicontrol_{kernel}_kernel_{self.kernel_type}")
             args += (qubits, ncontrols + 2)
-        else:
-            kernel = self.gates.get(f"{kernel}_kernel_{self.kernel_type}")
 
         nblocks, block_size = self.calculate_blocks(nstates)
         kernel((nblocks,), (block_size,), args)
-        self.cp.cuda.stream.get_current_stream().synchronize()
         return state
 
-    def multi_qubit_base(self, state, nqubits, targets, gate, qubits):
+    def one_qubit_density_matrix_base(self, state, nqubits, target, gate):
+        m1 = nqubits - target - 1
+        m2 = 2 * nqubits - target - 1
+        tk1, tk2 = 1 << m1, 1 << m2
+        nstates = 1 << (2 * nqubits - 2)
+        kernel = self.gates.get(f"apply_gate_density_matrix_kernel_{self.kernel_type}")
+        nblocks, block_size = self.calculate_blocks(nstates)
+        kernel((nblocks,), (block_size,), (state, tk1, tk2, m1, m2, gate))
+        return state
+
+    def multi_qubit_base(self, state, nqubits, targets, gate, qubits, conj=False):
         assert gate is not None
+        if conj:
+            gate = self.cp.conj(gate)
         if qubits is None:
             qubits = self.cast(
                 sorted(nqubits - q - 1 for q in targets), dtype=self.cp.int32
@@ -257,37 +326,144 @@ class CupyBackend(NumbaBackend):  # pragma: no cover
                 f"Number of target qubits must be <= {self.MAX_NUM_TARGETS}"
                 f" but is {ntargets}."
             )
+        targets = self._create_targets_tensor(targets, nqubits)
+        return self._launch_multi_qubit_kernel(state, nqubits, gate, qubits, targets)
+
+    def _launch_multi_qubit_kernel(self, state, nqubits, gate, qubits, targets):
+        # does not allocate device memory so that it can be captured in graphs
+        ntargets = len(targets)
         nactive = len(qubits)
-        targets = self.cp.asarray(
-            tuple(1 << (nqubits - t - 1) for t in targets[::-1]), dtype=self.cp.int64
-        )
         nstates = 1 << (nqubits - nactive)
-        nsubstates = 1 << ntargets
         nblocks, block_size = self.calculate_blocks(nstates)
         kernel = self.gates.get(
             f"apply_multi_qubit_gate_kernel_{self.kernel_type}_{ntargets}"
         )
         args = (state, gate, qubits, targets, ntargets, nactive)
         kernel((nblocks,), (block_size,), args)
-        self.cp.cuda.stream.get_current_stream().synchronize()
+        return state
+
+    def multi_swap_base(self, state, nqubits, pairs):
+        targets = self._create_swap_targets_tensor(pairs, nqubits)
+        nblocks, block_size = self.calculate_blocks(1 << nqubits)
+        kernel = self.gates.get(f"apply_multi_swap_kernel_{self.kernel_type}")
+        kernel((nblocks,), (block_size,), (state, targets, len(pairs)))
         return state
 
     def _create_qubits_tensor(self, gate, nqubits):
-        qubits = super()._create_qubits_tensor(gate, nqubits)
-        return self.cp.asarray(qubits, dtype=self.cp.int32)
+        # host tensors are also cached by ``NumbaBackend`` under keys
+        # without the device id
+        device = self.cp.cuda.Device().id
+        key = (device, gate.control_qubits, gate.target_qubits, nqubits)
+        if key not in self._qubits_cache:
+            qubits = super()._create_qubits_tensor(gate, nqubits)
+            self._qubits_cache[key] = self.cp.asarray(qubits, dtype=self.cp.int32)
+        return self._qubits_cache[key]
+
+    def _create_targets_tensor(self, targets, nqubits):
+        device = self.cp.cuda.Device().id
+        key = (device, tuple(targets), nqubits)
+        if key not in self._targets_cache:
+            targets = super()._create_targets_tensor(targets, nqubits)
+            self._targets_cache[key] = self.cp.asarray(targets, dtype=self.cp.int64)
+        return self._targets_cache[key]
+
+    def _create_swap_targets_tensor(self, pairs, nqubits):
+        # pairs are tuples, so keys do not collide with ``_create_targets_tensor``
+        device = self.cp.cuda.Device().id
+        key = (device, tuple(tuple(pair) for pair in pairs), nqubits)
+        if key not in self._targets_cache:
+            targets = [nqubits - q - 1 for pair in pairs for q in pair]
+            self._targets_cache[key] = self.cp.asarray(targets, dtype=self.cp.int32)
+        return self._targets_cache[key]
+
+    def _matrix_buffer(self):
+        """Pinned host and device buffers used to upload small gate matrices."""
+        key = (self.cp.cuda.Device().id, self.dtype)
+        if key not in self._matrix_buffers:
+            import cupyx  # pylint: disable=import-error
+
+            shape = (self.MATRIX_BUFFER_SLOTS, self.MATRIX_BUFFER_SIZE)
+            self._matrix_buffers[key] = {
+                "host": cupyx.empty_pinned(shape, dtype=self.dtype),
+                "device": self.cp.empty(shape, dtype=self.dtype),
+                "events": self.MATRIX_BUFFER_SLOTS * [None],
+                "slot": 0,
+            }
+        return self._matrix_buffers.get(key)
+
+    def _stage_matrix(self, matrix):
+        """Copy a small gate matrix to the device without synchronizing the host.
+
+        The matrix is written to a slot of a pinned host buffer and copied
+        asynchronously on the current stream. Slots are reused in a ring,
+        waiting only for the upload that previously used the same slot.
+        """
+        size = len(matrix)
+        stream = self.cp.cuda.get_current_stream()
+        with self._matrix_lock:
+            buffer = self._matrix_buffer()
+            slot = buffer["slot"]
+            buffer["slot"] = (slot + 1) % self.MATRIX_BUFFER_SLOTS
+            event = buffer["events"][slot]
+            if event is not None:
+                event.synchronize()
+            host = buffer["host"][slot, :size]
+            host[:] = matrix
+            device = buffer["device"][slot, :size]
+            device.set(host, stream=stream)
+            buffer["events"][slot] = stream.record()
+        return device
 
     def _as_custom_matrix(self, gate):
+        # matrices of gates without parameters depend only on the gate class,
+        # so they are uploaded once per device and precision
+        constant = not isinstance(gate, (ParametrizedGate, SpecialGate))
+        if constant:
+            key = (self.cp.cuda.Device().id, self.dtype, gate.__class__)
+            if key in self._matrix_cache:
+                return self._matrix_cache.get(key)
         matrix = super()._as_custom_matrix(gate)
-        return self.cp.asarray(matrix.ravel())
+        if isinstance(matrix, self.cp.ndarray):
+            return matrix.ravel()
+        matrix = np.ravel(matrix).astype(self.dtype, copy=False)
+        if constant:
+            # not staged because slots of the staging buffer are reused
+            self._matrix_cache[key] = self.cp.asarray(matrix)
+            return self._matrix_cache.get(key)
+        if len(matrix) > self.MATRIX_BUFFER_SIZE:
+            return self.cp.asarray(matrix)
+        return self._stage_matrix(matrix)
 
     # def apply_gate(self, gate, state, nqubits): Inherited from ``NumbaBackend``
 
-    # def apply_gate_density_matrix(self, gate, state, nqubits, inverse=False): Inherited from ``NumbaBackend``
+    # def apply_gates(self, gates, state, nqubits): Inherited from ``NumbaBackend``
+
+    def compile_circuit(self, gates, nqubits):
+        """Capture the kernels of a sequence of gates in a CUDA graph.
 
-    # def _apply_ygate_density_matrix(self, gate, state, nqubits): Inherited from ``NumbaBackend``
+        Args:
+            gates (list): Gates to apply, in order.
+            nqubits (int): Number of qubits of the state vector.
+
+        Returns:
+            A :class:`qibojit.backends.gpu.CudaGraphCircuit` that applies all
+            ``gates`` with a single graph launch when called. Parameters of
+            parametrized gates can be modified between calls.
+        """
+        return CudaGraphCircuit(self, gates, nqubits)
+
+    # def apply_gate_density_matrix(self, gate, state, nqubits): Inherited from ``NumbaBackend``
 
     # def apply_channel(self, gate): Inherited from ``NumbaBackend``
 
+    def _axpy(self, a, x, y):
+        y_flat = y.reshape(-1)
+        x = x.astype(y.dtype, copy=False)
+        self.cp.cublas.axpy(a, x.reshape(-1), y_flat)
+        if not y.flags.c_contiguous:
+            y[...] = y_flat.reshape(y.shape)
+        return y
+
     # def apply_channel_density_matrix(self, channel, state, nqubits): Inherited from ``NumbaBackend``
 
     def collapse_state(self, state, qubits, shot, nqubits, normalize=True):
@@ -302,7 +478,6 @@ class CupyBackend(NumbaBackend):  # pragma: no cover
         args = [state, qubits, int(shot), ntargets]
         kernel = self.gates.get(f"collapse_state_kernel_{self.kernel_type}")
         kernel((nblocks,), (block_size,), args)
-        self.cp.cuda.stream.get_current_stream().synchronize()
 
         if normalize:
             norm = self.cp.sqrt(self.cp.sum(self.cp.square(self.cp.abs(state))))
@@ -511,6 +686,12 @@ class CuQuantumBackend(CupyBackend):  # pragma: no cover
             if self.custom_matrices:
                 self.custom_matrices = CuQuantumMatrices(self.dtype)
 
+    def compile_circuit(self, gates, nqubits):
+        raise_error(
+            NotImplementedError,
+            f"CUDA graphs are not supported by {self.platform} backend.",
+        )
+
     def get_cuda_type(self, dtype="complex64"):
         if dtype == "complex128":
             return (
@@ -525,7 +706,9 @@ class CuQuantumBackend(CupyBackend):  # pragma: no cover
         else:
             raise TypeError("Type can be either complex64 or complex128")
 
-    def one_qubit_base(self, state, nqubits, target, kernel, gate, qubits=None):
+    def one_qubit_base(
+        self, state, nqubits, target, kernel, gate, qubits=None, conj=False
+    ):
         ntarget = 1
         target = nqubits - target - 1
         if qubits is not None:
@@ -542,6 +725,8 @@ class CuQuantumBackend(CupyBackend):  # pragma: no cover
 
         state = self.cast(state)
         gate = self.cast(gate)
+        if conj:
+            gate = self.cp.conj(gate)
         assert state.dtype == gate.dtype
         data_type, compute_type = self.get_cuda_type(state.dtype)
         if isinstance(gate, self.cp.ndarray):
@@ -593,7 +778,7 @@ class CuQuantumBackend(CupyBackend):  # pragma: no cover
         return state
 
     def two_qubit_base(
-        self, state, nqubits, target1, target2, kernel, gate, qubits=None
+        self, state, nqubits, target1, target2, kernel, gate, qubits=None, conj=False
     ):
         ntarget = 2
         target1 = nqubits - target1 - 1
@@ -613,6 +798,8 @@ class CuQuantumBackend(CupyBackend):  # pragma: no cover
 
         state = self.cast(state)
         gate = self.cast(gate)
+        if conj:
+            gate = self.cp.conj(gate)
 
         assert state.dtype == gate.dtype
         data_type, compute_type = self.get_cuda_type(state.dtype)
@@ -685,7 +872,30 @@ class CuQuantumBackend(CupyBackend):  # pragma: no cover
 
         return state
 
-    def multi_qubit_base(self, state, nqubits, targets, gate, qubits=None):
+    def multi_swap_base(self, state, nqubits, pairs):
+        state = self.cast(state)
+        data_type, _ = self.get_cuda_type(state.dtype)
+        bitSwaps = [(nqubits - q1 - 1, nqubits - q2 - 1) for q1, q2 in pairs]
+        self.cusv.swap_index_bits(
+            self.handle,
+            state.data.ptr,
+            data_type,
+            nqubits,
+            bitSwaps,
+            len(bitSwaps),
+            self.np.ones(0),
+            self.np.empty(0),
+            0,
+        )
+        return state
+
+    def one_qubit_density_matrix_base(self, state, nqubits, target, gate):
+        state = self.one_qubit_base(state, 2 * nqubits, target, "apply_gate", gate)
+        return self.one_qubit_base(
+            state, 2 * nqubits, target + nqubits, "apply_gate", gate, conj=True
+        )
+
+    def multi_qubit_base(self, state, nqubits, targets, gate, qubits=None, conj=False):
         state = self.cast(state)
         ntarget = len(targets)
         if qubits is None:
@@ -700,6 +910,8 @@ class CuQuantumBackend(CupyBackend):  # pragma: no cover
         ncontrols = len(controls)
         adjoint = 0
         gate = self.cast(gate)
+        if conj:
+            gate = self.cp.conj(gate)
         assert state.dtype == gate.dtype
         data_type, compute_type = self.get_cuda_type(state.dtype)
 
@@ -780,6 +992,146 @@ class CuQuantumBackend(CupyBackend):  # pragma: no cover
         return state
 
 
+class CudaGraphCircuit:  # pragma: no cover
+    """Sequence of gates captured once in a CUDA graph and relaunched on demand.
+
+    Kernels are captured with pointers to a state buffer and to gate matrices
+    owned by this object, so no memory is allocated or copied during the
+    launch. When called, only matrices of gates whose parameters changed
+    since the previous call are uploaded again.
+
+    Args:
+        backend (:class:`qibojit.backends.gpu.CupyBackend`): Backend used to
+            launch the kernels.
+        gates (list): Gates to apply, in order.
+        nqubits (int): Number of qubits of the state vector.
+    """
+
+    def __init__(self, backend, gates, nqubits):
+        from qibo.gates.channels import Channel
+        from qibo.gates.measurements import M
+        from qibo.gates.special import FusedGate
+
+        cp = backend.cp
+        self.backend = backend
+        self.gates = list(gates)
+        self.nqubits = nqubits
+        self.stream = cp.cuda.Stream(non_blocking=True)
+
+        launches = []
+        self.host_matrices, self.matrices = [], []
+        # device tensors referenced by the captured kernels
+        self._tensors = []
+        with self.stream:
+            self.state = cp.empty(2**nqubits, dtype=backend.dtype)
+            for gate in self.gates:
+                special = isinstance(gate, SpecialGate) and not isinstance(
+                    gate, FusedGate
+                )
+                if special or isinstance(gate, (M, Channel)):
+                    raise_error(
+                        ValueError,
+                        f"Cannot capture {gate.__class__.__name__} in a CUDA graph.",
+                    )
+                matrix = self._host_matrix(gate)
+                self.host_matrices.append(matrix)
+                self.matrices.append(cp.asarray(matrix))
+                qubits = backend._create_qubits_tensor(gate, nqubits)
+                self._tensors.append(qubits)
+                launches.append(self._launcher(gate, self.matrices[-1], qubits))
+
+            self.stream.begin_capture()
+            try:
+                for launch in launches:
+                    launch(self.state)
+            finally:
+                self.graph = self.stream.end_capture()
+
+    def _host_matrix(self, gate):
+        matrix = super(CupyBackend, self.backend)._as_custom_matrix(gate)
+        return np.ravel(self.backend.to_numpy(matrix)).astype(self.backend.dtype)
+
+    def _launcher(self, gate, matrix, qubits):
+        from functools import partial
+
+        from qibojit.backends.cpu import GATE_OPS
+
+        backend, nqubits = self.backend, self.nqubits
+        name = gate.__class__.__name__
+        targets = gate.target_qubits
+        if len(targets) == 1:
+            return partial(
+                backend.one_qubit_base,
+                nqubits=nqubits,
+                target=targets[0],
+                kernel=GATE_OPS.get(name, "apply_gate"),
+                gate=matrix,
+                qubits=qubits,
+            )
+        elif len(targets) == 2:
+            return partial(
+                backend.two_qubit_base,
+                nqubits=nqubits,
+                target1=targets[0],
+                target2=targets[1],
+                kernel=GATE_OPS.get(name, "apply_two_qubit_gate"),
+                gate=matrix,
+                qubits=qubits,
+            )
+        if len(targets) > backend.MAX_NUM_TARGETS:
+            raise_error(
+                ValueError,
+                f"Number of target qubits must be <= {backend.MAX_NUM_TARGETS}"
+                f" but is {len(targets)}.",
+            )
+        targets = backend._create_targets_tensor(targets, nqubits)
+        self._tensors.append(targets)
+        return partial(
+            backend._launch_multi_qubit_kernel,
+            nqubits=nqubits,
+            gate=matrix,
+            qubits=qubits,
+            targets=targets,
+        )
+
+    def _update_matrices(self):
+        from qibo.gates.special import FusedGate
+
+        for i, gate in enumerate(self.gates):
+            if isinstance(gate, (ParametrizedGate, FusedGate)):
+                matrix = self._host_matrix(gate)
+                if not np.array_equal(matrix, self.host_matrices[i]):
+                    self.matrices[i].set(matrix, stream=self.stream)
+                    self.host_matrices[i] = matrix
+
+    def __call__(self, initial_state=None):
+        """Apply the captured gates.
+
+        Args:
+            initial_state: State vector to apply the gates to. If ``None``
+                the gates are applied to the zero state.
+
+        Returns:
+            The final state vector as a new ``cupy`` array.
+        """
+        cp = self.backend.cp
+        current = cp.cuda.get_current_stream()
+        # wait for pending updates of ``initial_state`` and let the
+        # current stream wait for the result instead of blocking the host
+        self.stream.wait_event(current.record())
+        with self.stream:
+            self._update_matrices()
+            if initial_state is None:
+                self.state.fill(0)
+                self.state[0] = 1
+            else:
+                self.state[...] = self.backend.cast(initial_state).ravel()
+            self.graph.launch(self.stream)
+            state = self.state.copy()
+        current.wait_event(self.stream.record())
+        return state
+
+
 class MultiGpuOps:  # pragma: no cover
     # CI does not have GPUs
 
@@ -0,0 +1,162 @@
+import ctypes
+import ctypes.util
+import glob
+import itertools
+import os
+import re
+import sys
+
+from qibo.config import raise_error
+
+NUMA_POLICIES = ("local", "interleave")
+
+
+def _parse_cpulist(cpulist):
+    """Convert a cpulist string such as ``"0-3,8-11"`` to a list of integers."""
+    cpus = []
+    for chunk in cpulist.strip().split(","):
+        if not chunk:
+            continue
+        if "-" in chunk:
+            start, stop = chunk.split("-")
+            cpus.extend(range(int(start), int(stop) + 1))
+        else:
+            cpus.append(int(chunk))
+    return cpus
+
+
+# affinity of the process before threads are pinned for the first time
+_ORIGINAL_AFFINITY = None
+# policy set by the last call to ``set_numa_policy``, shared by all backends
+# because the affinity of threads is global to the process
+_NUMA_POLICY = None
+
+
+def numa_policy():
+    """Policy set with :func:`set_numa_policy`, ``None`` if threads are not pinned."""
+    return _NUMA_POLICY
+
+
+def original_affinity():
+    """CPUs available to the process before any call to :func:`pin_threads`."""
+    if _ORIGINAL_AFFINITY is None:
+        return os.sched_getaffinity(0)
+    return set(_ORIGINAL_AFFINITY)
+
+
+def numa_nodes():
+    """CPUs originally available to the process grouped by NUMA node."""
+    affinity = original_affinity()
+    paths = glob.glob("/sys/devices/system/node/node[0-9]*/cpulist")
+    paths = sorted(paths, key=lambda p: int(re.findall(r"node(\d+)", p)[-1]))
+    nodes = []
+    for path in paths:
+        with open(path) as file:
+            cpus = [c for c in _parse_cpulist(file.read()) if c in affinity]
+        if cpus:
+            nodes.append(cpus)
+    if not nodes:  # pragma: no cover
+        nodes.append(sorted(affinity))
+    return nodes
+
+
+def balanced_cpus(nthreads):
+    """Select ``nthreads`` CPUs distributed evenly across NUMA nodes."""
+    nodes = numa_nodes()
+    cpus = itertools.chain.from_iterable(itertools.zip_longest(*nodes))
+    return [cpu for cpu in cpus if cpu is not None][:nthreads]
+
+
+def pin_threads(cpus):
+    """Restrict all threads of the current process to the given CPUs.
+
+    Numba worker threads are already running when the number of threads
+    is changed, so the affinity is set on every task of the process
+    instead of only on the calling thread. The affinity before the first
+    call is recorded and can be recovered with :func:`restore_affinity`.
+    """
+    global _ORIGINAL_AFFINITY
+    if _ORIGINAL_AFFINITY is None:
+        _ORIGINAL_AFFINITY = os.sched_getaffinity(0)
+    cpus = set(cpus)
+    for tid in os.listdir("/proc/self/task"):
+        try:
+            os.sched_setaffinity(int(tid), cpus)
+        except (ProcessLookupError, PermissionError):  # pragma: no cover
+            # thread exited or cannot be modified
+            pass
+
+
+def restore_affinity():
+    """Undo :func:`pin_threads` and restore the original affinity of all threads."""
+    global _NUMA_POLICY
+    _NUMA_POLICY = None
+    if _ORIGINAL_AFFINITY is not None:
+        pin_threads(_ORIGINAL_AFFINITY)
+
+
+def _load_libnuma():
+    libname = ctypes.util.find_library("numa")
+    if libname is None:  # pragma: no cover
+        raise_error(
+            RuntimeError, "libnuma is required for ``numa_policy='interleave'``."
+        )
+    libnuma = ctypes.CDLL(libname)
+    if libnuma.numa_available() < 0:  # pragma: no cover
+        raise_error(RuntimeError, "NUMA is not available on this system.")
+    libnuma.numa_interleave_memory.argtypes = [
+        ctypes.c_void_p,
+        ctypes.c_size_t,
+        ctypes.c_void_p,
+    ]
+    libnuma.numa_interleave_memory.restype = None
+    return libnuma
+
+
+def interleave_memory(array):
+    """Interleave the pages of an array round-robin across all NUMA nodes.
+
+    The policy is bound to the memory of ``array`` with ``mbind``, so it
+    applies to the threads that first touch the pages. It must therefore be
+    called before the array is written.
+    """
+    libnuma = _load_libnuma()
+    pagesize = os.sysconf("SC_PAGE_SIZE")
+    address = array.ctypes.data
+    # ``mbind`` requires a page aligned start address
+    start = address - address % pagesize
+    libnuma.numa_interleave_memory(
+        start,
+        address + array.nbytes - start,
+        ctypes.c_void_p.in_dll(libnuma, "numa_all_nodes_ptr"),
+    )
+    return array
+
+
+def set_numa_policy(nthreads, policy):
+    """Pin ``nthreads`` threads evenly across NUMA nodes.
+
+    The policy applies to the whole process and is returned by
+    :func:`numa_policy` until :func:`restore_affinity` is called.
+
+    Args:
+        nthreads (int): Number of threads used by the simulation.
+        policy (str): ``"local"`` relies on the parallel first-touch
+            initialization of states so that each page lives on the node
+            of the thread that updates it. ``"interleave"`` instead spreads
+            the pages of new states round-robin over all nodes, see
+            :func:`qibojit.backends.numa.interleave_memory`.
+    """
+    if policy not in NUMA_POLICIES:
+        raise_error(
+            ValueError,
+            f"Unknown NUMA policy {policy}. Available policies are {NUMA_POLICIES}.",
+        )
+    if sys.platform != "linux":  # pragma: no cover
+        raise_error(NotImplementedError, "NUMA policies are only supported on Linux.")
+    if policy == "interleave":
+        # fail early if states cannot be interleaved
+        _load_libnuma()
+    global _NUMA_POLICY
+    pin_threads(balanced_cpus(nthreads))
+    _NUMA_POLICY = policy
@@ -1,6 +1,10 @@
 import numpy as np
 from numba import njit, prange
 
+# minimum number of contiguous blocks for which one and two-qubit kernels
+# parallelize over blocks instead of over individual updates
+MIN_PARALLEL_BLOCKS = 256
+
 
 @njit("int64(int64, int32[:])", cache=True)
 def multicontrol_index(g, qubits):
@@ -12,72 +16,128 @@ def multicontrol_index(g, qubits):
     return i
 
 
+@njit(inline="always")
+def apply_gate_pairs(state, gate, nstates, m, conj):
+    # shared by ``apply_gate_kernel`` and ``specialized_apply_gate_kernel``;
+    # inlined at numba IR level so that ``prange`` is parallelized by the
+    # calling kernel and constant ``nstates`` and ``m`` are folded
+    tk = 1 << m
+    nblocks = nstates >> m
+    # keep gate elements in registers so that the loop can be vectorized
+    g00, g01, g10, g11 = gate[0, 0], gate[0, 1], gate[1, 0], gate[1, 1]
+    if conj:
+        g00, g01 = g00.conjugate(), g01.conjugate()
+        g10, g11 = g10.conjugate(), g11.conjugate()
+    if nblocks < MIN_PARALLEL_BLOCKS:
+        # too few blocks to share between threads, iterate over pairs instead
+        for g in prange(nstates):  # pylint: disable=not-an-iterable
+            i1 = ((g >> m) << (m + 1)) + (g & (tk - 1))
+            i2 = i1 + tk
+            s1, s2 = state[i1], state[i2]
+            state[i1] = g00 * s1 + g01 * s2
+            state[i2] = g10 * s1 + g11 * s2
+        return state
+    # pairs are ``2^m`` apart and consecutive pairs are contiguous within
+    # blocks of ``2^(m+1)`` amplitudes, so the inner loop has unit stride
+    for b in prange(nblocks):  # pylint: disable=not-an-iterable
+        base = b << (m + 1)
+        for i1 in range(base, base + tk):
+            i2 = i1 + tk
+            s1, s2 = state[i1], state[i2]
+            state[i1] = g00 * s1 + g01 * s2
+            state[i2] = g10 * s1 + g11 * s2
+    return state
+
+
 @njit(
     [
-        "complex64[:](complex64[:], complex64[:,:], int64, int64)",
-        "complex128[:](complex128[:], complex128[:,:], int64, int64)",
+        "complex64[:](complex64[:], complex64[:,:], int64, int64, boolean)",
+        "complex128[:](complex128[:], complex128[:,:], int64, int64, boolean)",
     ],
     parallel=True,
+    fastmath=True,
     cache=True,
 )
-def apply_gate_kernel(state, gate, nstates, m):
-    tk = 1 << m
-    for g in prange(nstates):  # pylint: disable=not-an-iterable
-        i1 = ((g >> m) << (m + 1)) + (g & (tk - 1))
-        i2 = i1 + tk
-        state[i1], state[i2] = (
-            gate[0, 0] * state[i1] + gate[0, 1] * state[i2],
-            gate[1, 0] * state[i1] + gate[1, 1] * state[i2],
-        )
-    return state
+def apply_gate_kernel(state, gate, nstates, m, conj=False):
+    return apply_gate_pairs(state, gate, nstates, m, conj)
+
+
+def specialized_apply_gate_kernel(nstates, m):
+    """Compile ``apply_gate_kernel`` for fixed ``nstates`` and ``m``.
+
+    Both values are captured as compile-time constants, so that loop bounds,
+    strides and masks are folded in the generated code. The returned kernel
+    takes only ``(state, gate, conj)``.
+    """
+
+    @njit(
+        [
+            "complex64[:](complex64[:], complex64[:,:], boolean)",
+            "complex128[:](complex128[:], complex128[:,:], boolean)",
+        ],
+        parallel=True,
+        fastmath=True,
+        cache=True,
+    )
+    def kernel(state, gate, conj=False):
+        return apply_gate_pairs(state, gate, nstates, m, conj)
+
+    return kernel
 
 
 @njit(
     [
-        "complex64[:](complex64[:], complex64[:,:], int32[:], int64, int64)",
-        "complex128[:](complex128[:], complex128[:,:], int32[:], int64, int64)",
+        "complex64[:](complex64[:], complex64[:,:], int32[:], int64, int64, boolean)",
+        "complex128[:](complex128[:], complex128[:,:], int32[:], int64, int64, boolean)",
     ],
     parallel=True,
+    fastmath=True,
     cache=True,
 )
-def multicontrol_apply_gate_kernel(state, gate, qubits, nstates, m):
+def multicontrol_apply_gate_kernel(state, gate, qubits, nstates, m, conj=False):
     tk = 1 << m
+    g00, g01, g10, g11 = gate[0, 0], gate[0, 1], gate[1, 0], gate[1, 1]
+    if conj:
+        g00, g01 = g00.conjugate(), g01.conjugate()
+        g10, g11 = g10.conjugate(), g11.conjugate()
     for g in prange(nstates):  # pylint: disable=not-an-iterable
         i = multicontrol_index(g, qubits)
         i1, i2 = i - tk, i
-        state[i1], state[i2] = (
-            gate[0, 0] * state[i1] + gate[0, 1] * state[i2],
-            gate[1, 0] * state[i1] + gate[1, 1] * state[i2],
-        )
+        s1, s2 = state[i1], state[i2]
+        state[i1] = g00 * s1 + g01 * s2
+        state[i2] = g10 * s1 + g11 * s2
     return state
 
 
 @njit(
     [
-        "complex64[:](complex64[:], optional(complex64[:,:]), int64, int64)",
-        "complex128[:](complex128[:], optional(complex128[:,:]), int64, int64)",
+        "complex64[:](complex64[:], optional(complex64[:,:]), int64, int64, boolean)",
+        "complex128[:](complex128[:], optional(complex128[:,:]), int64, int64, boolean)",
     ],
     parallel=True,
     cache=True,
 )
-def apply_x_kernel(state, gate, nstates, m):
+def apply_x_kernel(state, gate, nstates, m, conj=False):
     tk = 1 << m
+    # the inserted target bit does not overlap with the low and high bits
+    # of ``g`` so indices are built with shifts and ORs only
+    lo_mask, hi_shift = tk - 1, m + 1
     for g in prange(nstates):  # pylint: disable=not-an-iterable
-        i1 = ((g >> m) << (m + 1)) + (g & (tk - 1))
-        i2 = i1 + tk
+        i1 = ((g >> m) << hi_shift) | (g & lo_mask)
+        i2 = i1 | tk
         state[i1], state[i2] = state[i2], state[i1]
     return state
 
 
 @njit(
     [
-        "complex64[:](complex64[:], optional(complex64[:,:]), int32[:], int64, int64)",
-        "complex128[:](complex128[:], optional(complex128[:,:]), int32[:], int64, int64)",
+        "complex64[:](complex64[:], optional(complex64[:,:]), int32[:], int64, int64, boolean)",
+        "complex128[:](complex128[:], optional(complex128[:,:]), int32[:], int64, int64, boolean)",
     ],
     parallel=True,
     cache=True,
 )
-def multicontrol_apply_x_kernel(state, gate, qubits, nstates, m):
+def multicontrol_apply_x_kernel(state, gate, qubits, nstates, m, conj=False):
     tk = 1 << m
     for g in prange(nstates):  # pylint: disable=not-an-iterable
         i = multicontrol_index(g, qubits)
@@ -88,63 +148,68 @@ def multicontrol_apply_x_kernel(state, gate, qubits, nstates, m):
 
 @njit(
     [
-        "complex64[:](complex64[:], optional(complex64[:,:]), int64, int64)",
-        "complex128[:](complex128[:], optional(complex128[:,:]), int64, int64)",
+        "complex64[:](complex64[:], optional(complex64[:,:]), int64, int64, boolean)",
+        "complex128[:](complex128[:], optional(complex128[:,:]), int64, int64, boolean)",
     ],
     parallel=True,
     cache=True,
 )
-def apply_y_kernel(state, gate, nstates, m):
+def apply_y_kernel(state, gate, nstates, m, conj=False):
     tk = 1 << m
+    lo_mask, hi_shift = tk - 1, m + 1
+    # the conjugate of Y is -Y
+    phase = -1j if conj else 1j
     for g in prange(nstates):  # pylint: disable=not-an-iterable
-        i1 = ((g >> m) << (m + 1)) + (g & (tk - 1))
-        i2 = i1 + tk
-        state[i1], state[i2] = -1j * state[i2], 1j * state[i1]
+        i1 = ((g >> m) << hi_shift) | (g & lo_mask)
+        i2 = i1 | tk
+        state[i1], state[i2] = -phase * state[i2], phase * state[i1]
     return state
 
 
 @njit(
     [
-        "complex64[:](complex64[:], optional(complex64[:,:]), int32[:], int64, int64)",
-        "complex128[:](complex128[:], optional(complex128[:,:]), int32[:], int64, int64)",
+        "complex64[:](complex64[:], optional(complex64[:,:]), int32[:], int64, int64, boolean)",
+        "complex128[:](complex128[:], optional(complex128[:,:]), int32[:], int64, int64, boolean)",
     ],
     parallel=True,
     cache=True,
 )
-def multicontrol_apply_y_kernel(state, gate, qubits, nstates, m):
+def multicontrol_apply_y_kernel(state, gate, qubits, nstates, m, conj=False):
     tk = 1 << m
+    phase = -1j if conj else 1j
     for g in prange(nstates):  # pylint: disable=not-an-iterable
         i = multicontrol_index(g, qubits)
         i1, i2 = i - tk, i
-        state[i1], state[i2] = -1j * state[i2], 1j * state[i1]
+        state[i1], state[i2] = -phase * state[i2], phase * state[i1]
     return state
 
 
 @njit(
     [
-        "complex64[:](complex64[:], optional(complex64[:,:]), int64, int64)",
-        "complex128[:](complex128[:], optional(complex128[:,:]), int64, int64)",
+        "complex64[:](complex64[:], optional(complex64[:,:]), int64, int64, boolean)",
+        "complex128[:](complex128[:], optional(complex128[:,:]), int64, int64, boolean)",
     ],
     parallel=True,
     cache=True,
 )
-def apply_z_kernel(state, gate, nstates, m):
+def apply_z_kernel(state, gate, nstates, m, conj=False):
     tk = 1 << m
+    lo_mask, hi_shift = tk - 1, m + 1
     for g in prange(nstates):  # pylint: disable=not-an-iterable
-        i = ((g >> m) << (m + 1)) + (g & (tk - 1))
-        state[i + tk] *= -1
+        i = ((g >> m) << hi_shift) | (g & lo_mask) | tk
+        state[i] = -state[i]
     return state
 
 
 @njit(
     [
-        "complex64[:](complex64[:], optional(complex64[:,:]), int32[:], int64, int64)",
-        "complex128[:](complex128[:], optional(complex128[:,:]), int32[:], int64, int64)",
+        "complex64[:](complex64[:], optional(complex64[:,:]), int32[:], int64, int64, boolean)",
+        "complex128[:](complex128[:], optional(complex128[:,:]), int32[:], int64, int64, boolean)",
     ],
     parallel=True,
     cache=True,
 )
-def multicontrol_apply_z_kernel(state, gate, qubits, nstates, m):
+def multicontrol_apply_z_kernel(state, gate, qubits, nstates, m, conj=False):
     tk = 1 << m
     for g in prange(nstates):  # pylint: disable=not-an-iterable
         i = multicontrol_index(g, qubits)
@@ -154,14 +219,16 @@ def multicontrol_apply_z_kernel(state, gate, qubits, nstates, m):
 
 @njit(
     [
-        "complex64[:](complex64[:], complex64, int64, int64)",
-        "complex128[:](complex128[:], complex128, int64, int64)",
+        "complex64[:](complex64[:], complex64, int64, int64, boolean)",
+        "complex128[:](complex128[:], complex128, int64, int64, boolean)",
     ],
     parallel=True,
     cache=True,
 )
-def apply_z_pow_kernel(state, gate, nstates, m):
+def apply_z_pow_kernel(state, gate, nstates, m, conj=False):
     tk = 1 << m
+    if conj:
+        gate = gate.conjugate()
     for g in prange(nstates):  # pylint: disable=not-an-iterable
         i = ((g >> m) << (m + 1)) + (g & (tk - 1))
         state[i + tk] = gate * state[i + tk]
@@ -170,14 +237,16 @@ def apply_z_pow_kernel(state, gate, nstates, m):
 
 @njit(
     [
-        "complex64[:](complex64[:], complex64, int32[:], int64, int64)",
-        "complex128[:](complex128[:], complex128, int32[:], int64, int64)",
+        "complex64[:](complex64[:], complex64, int32[:], int64, int64, boolean)",
+        "complex128[:](complex128[:], complex128, int32[:], int64, int64, boolean)",
     ],
     parallel=True,
     cache=True,
 )
-def multicontrol_apply_z_pow_kernel(state, gate, qubits, nstates, m):
+def multicontrol_apply_z_pow_kernel(state, gate, qubits, nstates, m, conj=False):
     tk = 1 << m
+    if conj:
+        gate = gate.conjugate()
     for g in prange(nstates):  # pylint: disable=not-an-iterable
         i = multicontrol_index(g, qubits)
         state[i] = gate * state[i]
@@ -186,125 +255,133 @@ def multicontrol_apply_z_pow_kernel(state, gate, qubits, nstates, m):
 
 @njit(
     [
-        "complex64[:](complex64[:], complex64[:,:], int64, int64, int64, boolean)",
-        "complex128[:](complex128[:], complex128[:,:], int64, int64, int64, boolean)",
+        "complex64[:](complex64[:], complex64[:,:], int64, int64, int64, boolean, boolean)",
+        "complex128[:](complex128[:], complex128[:,:], int64, int64, int64, boolean, boolean)",
     ],
     parallel=True,
+    fastmath=True,
     cache=True,
 )
-def apply_two_qubit_gate_kernel(state, gate, nstates, m1, m2, swap_targets=False):
+def apply_two_qubit_gate_kernel(
+    state, gate, nstates, m1, m2, swap_targets=False, conj=False
+):
     tk1, tk2 = 1 << m1, 1 << m2
     uk1, uk2 = tk1, tk2
     if swap_targets:
         uk1, uk2 = uk2, uk1
-    for g in prange(nstates):  # pylint: disable=not-an-iterable
-        i = ((g >> m1) << (m1 + 1)) + (g & (tk1 - 1))
-        i = ((i >> m2) << (m2 + 1)) + (i & (tk2 - 1))
-        i1, i2 = i + uk1, i + uk2
-        i3 = i + tk1 + tk2
-        buffer0, buffer1, buffer2 = state[i], state[i1], state[i2]
-        state[i] = (
-            gate[0, 0] * state[i]
-            + gate[0, 1] * state[i1]
-            + gate[0, 2] * state[i2]
-            + gate[0, 3] * state[i3]
-        )
-        state[i1] = (
-            gate[1, 0] * buffer0
-            + gate[1, 1] * state[i1]
-            + gate[1, 2] * state[i2]
-            + gate[1, 3] * state[i3]
-        )
-        state[i2] = (
-            gate[2, 0] * buffer0
-            + gate[2, 1] * buffer1
-            + gate[2, 2] * state[i2]
-            + gate[2, 3] * state[i3]
-        )
-        state[i3] = (
-            gate[3, 0] * buffer0
-            + gate[3, 1] * buffer1
-            + gate[3, 2] * buffer2
-            + gate[3, 3] * state[i3]
-        )
+    # load the gate once, the compiler cannot keep its elements in registers
+    # otherwise because ``gate`` and ``state`` may alias
+    g00, g01, g02, g03 = gate[0, 0], gate[0, 1], gate[0, 2], gate[0, 3]
+    g10, g11, g12, g13 = gate[1, 0], gate[1, 1], gate[1, 2], gate[1, 3]
+    g20, g21, g22, g23 = gate[2, 0], gate[2, 1], gate[2, 2], gate[2, 3]
+    g30, g31, g32, g33 = gate[3, 0], gate[3, 1], gate[3, 2], gate[3, 3]
+    if conj:
+        g00, g01 = g00.conjugate(), g01.conjugate()
+        g02, g03 = g02.conjugate(), g03.conjugate()
+        g10, g11 = g10.conjugate(), g11.conjugate()
+        g12, g13 = g12.conjugate(), g13.conjugate()
+        g20, g21 = g20.conjugate(), g21.conjugate()
+        g22, g23 = g22.conjugate(), g23.conjugate()
+        g30, g31 = g30.conjugate(), g31.conjugate()
+        g32, g33 = g32.conjugate(), g33.conjugate()
+    nblocks = nstates >> m1
+    if nblocks < MIN_PARALLEL_BLOCKS:
+        for g in prange(nstates):  # pylint: disable=not-an-iterable
+            i = ((g >> m1) << (m1 + 1)) + (g & (tk1 - 1))
+            i = ((i >> m2) << (m2 + 1)) + (i & (tk2 - 1))
+            i1, i2 = i + uk1, i + uk2
+            i3 = i + tk1 + tk2
+            s0, s1, s2, s3 = state[i], state[i1], state[i2], state[i3]
+            state[i] = g00 * s0 + g01 * s1 + g02 * s2 + g03 * s3
+            state[i1] = g10 * s0 + g11 * s1 + g12 * s2 + g13 * s3
+            state[i2] = g20 * s0 + g21 * s1 + g22 * s2 + g23 * s3
+            state[i3] = g30 * s0 + g31 * s1 + g32 * s2 + g33 * s3
+        return state
+    # each block is a run of ``2^m1`` consecutive indices in each of the four
+    # streams ``i``, ``i + uk1``, ``i + uk2`` and ``i + tk1 + tk2``
+    for b in prange(nblocks):  # pylint: disable=not-an-iterable
+        base = b << (m1 + 1)
+        base = ((base >> m2) << (m2 + 1)) + (base & (tk2 - 1))
+        for i in range(base, base + tk1):
+            i1, i2 = i + uk1, i + uk2
+            i3 = i + tk1 + tk2
+            s0, s1, s2, s3 = state[i], state[i1], state[i2], state[i3]
+            state[i] = g00 * s0 + g01 * s1 + g02 * s2 + g03 * s3
+            state[i1] = g10 * s0 + g11 * s1 + g12 * s2 + g13 * s3
+            state[i2] = g20 * s0 + g21 * s1 + g22 * s2 + g23 * s3
+            state[i3] = g30 * s0 + g31 * s1 + g32 * s2 + g33 * s3
     return state
 
 
 @njit(
     [
-        "complex64[:](complex64[:], complex64[:,:], int32[:], int64, int64, int64, boolean)",
-        "complex128[:](complex128[:], complex128[:,:], int32[:], int64, int64, int64, boolean)",
+        "complex64[:](complex64[:], complex64[:,:], int32[:], int64, int64, int64, boolean, boolean)",
+        "complex128[:](complex128[:], complex128[:,:], int32[:], int64, int64, int64, boolean, boolean)",
     ],
     parallel=True,
     cache=True,
 )
 def multicontrol_apply_two_qubit_gate_kernel(
-    state, gate, qubits, nstates, m1, m2, swap_targets=False
+    state, gate, qubits, nstates, m1, m2, swap_targets=False, conj=False
 ):
     tk1, tk2 = 1 << m1, 1 << m2
     uk1, uk2 = tk1, tk2
     if swap_targets:
         uk1, uk2 = uk2, uk1
+    g00, g01, g02, g03 = gate[0, 0], gate[0, 1], gate[0, 2], gate[0, 3]
+    g10, g11, g12, g13 = gate[1, 0], gate[1, 1], gate[1, 2], gate[1, 3]
+    g20, g21, g22, g23 = gate[2, 0], gate[2, 1], gate[2, 2], gate[2, 3]
+    g30, g31, g32, g33 = gate[3, 0], gate[3, 1], gate[3, 2], gate[3, 3]
+    if conj:
+        g00, g01 = g00.conjugate(), g01.conjugate()
+        g02, g03 = g02.conjugate(), g03.conjugate()
+        g10, g11 = g10.conjugate(), g11.conjugate()
+        g12, g13 = g12.conjugate(), g13.conjugate()
+        g20, g21 = g20.conjugate(), g21.conjugate()
+        g22, g23 = g22.conjugate(), g23.conjugate()
+        g30, g31 = g30.conjugate(), g31.conjugate()
+        g32, g33 = g32.conjugate(), g33.conjugate()
     for g in prange(nstates):  # pylint: disable=not-an-iterable
         i = multicontrol_index(g, qubits)
         i1, i2 = i - uk2, i - uk1
         i0 = i1 - uk1
-        buffer0, buffer1, buffer2 = state[i0], state[i1], state[i2]
-        state[i0] = (
-            gate[0, 0] * state[i0]
-            + gate[0, 1] * state[i1]
-            + gate[0, 2] * state[i2]
-            + gate[0, 3] * state[i]
-        )
-        state[i1] = (
-            gate[1, 0] * buffer0
-            + gate[1, 1] * state[i1]
-            + gate[1, 2] * state[i2]
-            + gate[1, 3] * state[i]
-        )
-        state[i2] = (
-            gate[2, 0] * buffer0
-            + gate[2, 1] * buffer1
-            + gate[2, 2] * state[i2]
-            + gate[2, 3] * state[i]
-        )
-        state[i] = (
-            gate[3, 0] * buffer0
-            + gate[3, 1] * buffer1
-            + gate[3, 2] * buffer2
-            + gate[3, 3] * state[i]
-        )
+        s0, s1, s2, s3 = state[i0], state[i1], state[i2], state[i]
+        state[i0] = g00 * s0 + g01 * s1 + g02 * s2 + g03 * s3
+        state[i1] = g10 * s0 + g11 * s1 + g12 * s2 + g13 * s3
+        state[i2] = g20 * s0 + g21 * s1 + g22 * s2 + g23 * s3
+        state[i] = g30 * s0 + g31 * s1 + g32 * s2 + g33 * s3
     return state
 
 
 @njit(
     [
-        "complex64[:](complex64[:], optional(complex64[:,:]), int64, int64, int64, boolean)",
-        "complex128[:](complex128[:], optional(complex128[:,:]), int64, int64, int64, boolean)",
+        "complex64[:](complex64[:], optional(complex64[:,:]), int64, int64, int64, boolean, boolean)",
+        "complex128[:](complex128[:], optional(complex128[:,:]), int64, int64, int64, boolean, boolean)",
     ],
     parallel=True,
     cache=True,
 )
-def apply_swap_kernel(state, gate, nstates, m1, m2, swap_targets=False):
+def apply_swap_kernel(state, gate, nstates, m1, m2, swap_targets=False, conj=False):
     tk1, tk2 = 1 << m1, 1 << m2
+    lo_mask1, lo_mask2 = tk1 - 1, tk2 - 1
     for g in prange(nstates):  # pylint: disable=not-an-iterable
-        i = ((g >> m1) << (m1 + 1)) + (g & (tk1 - 1))
-        i = ((i >> m2) << (m2 + 1)) + (i & (tk2 - 1))
-        i1, i2 = i + tk1, i + tk2
+        i = ((g >> m1) << (m1 + 1)) | (g & lo_mask1)
+        i = ((i >> m2) << (m2 + 1)) | (i & lo_mask2)
+        i1, i2 = i | tk1, i | tk2
         state[i1], state[i2] = state[i2], state[i1]
     return state
 
 
 @njit(
     [
-        "complex64[:](complex64[:], optional(complex64[:,:]), int32[:], int64, int64, int64, boolean)",
-        "complex128[:](complex128[:], optional(complex128[:,:]), int32[:], int64, int64, int64, boolean)",
+        "complex64[:](complex64[:], optional(complex64[:,:]), int32[:], int64, int64, int64, boolean, boolean)",
+        "complex128[:](complex128[:], optional(complex128[:,:]), int32[:], int64, int64, int64, boolean, boolean)",
     ],
     parallel=True,
     cache=True,
 )
 def multicontrol_apply_swap_kernel(
-    state, gate, qubits, nstates, m1, m2, swap_targets=False
+    state, gate, qubits, nstates, m1, m2, swap_targets=False, conj=False
 ):
     tk1, tk2 = 1 << m1, 1 << m2
     uk1, uk2 = tk1, tk2
@@ -317,53 +394,121 @@ def multicontrol_apply_swap_kernel(
 
 @njit(
     [
-        "complex64[:](complex64[:], complex64[:], int64, int64, int64, boolean)",
-        "complex128[:](complex128[:], complex128[:], int64, int64, int64, boolean)",
+        "complex64[:](complex64[:], int64[:], int64[:], int64[:], int64)",
+        "complex128[:](complex128[:], int64[:], int64[:], int64[:], int64)",
     ],
     parallel=True,
     cache=True,
 )
-def apply_fsim_kernel(state, gate, nstates, m1, m2, swap_targets=False):
+def apply_multi_swap_kernel(state, qubits, masks, flips, nfree):
+    # ``qubits`` are the swapped bits in increasing order. Since pairs are
+    # disjoint the permutation is an involution, so only indices whose first
+    # differing pair is ``(0, 1)`` are visited: ``masks`` holds the swapped
+    # bits set in each such pattern and ``flips`` the bits toggled to find
+    # the partner index. All patterns are handled for each value of the free
+    # bits, so that neighbouring amplitudes are swapped together.
+    nstates = 1 << nfree
+    for g in prange(nstates):  # pylint: disable=not-an-iterable
+        i = 0
+        i += g
+        for n in qubits:
+            i = ((i >> n) << (n + 1)) + (i & ((1 << n) - 1))
+        for p in range(len(masks)):
+            k = i | masks[p]
+            j = k ^ flips[p]
+            state[k], state[j] = state[j], state[k]
+    return state
+
+
+@njit(
+    [
+        "complex64[:](complex64[:], complex64[:], int64, int64, int64, boolean, boolean)",
+        "complex128[:](complex128[:], complex128[:], int64, int64, int64, boolean, boolean)",
+    ],
+    parallel=True,
+    fastmath=True,
+    cache=True,
+)
+def apply_fsim_kernel(state, gate, nstates, m1, m2, swap_targets=False, conj=False):
     tk1, tk2 = 1 << m1, 1 << m2
     uk1, uk2 = tk1, tk2
     if swap_targets:
         uk1, uk2 = uk2, uk1
+    g0, g1, g2, g3, g4 = gate[0], gate[1], gate[2], gate[3], gate[4]
+    if conj:
+        g0, g1, g2 = g0.conjugate(), g1.conjugate(), g2.conjugate()
+        g3, g4 = g3.conjugate(), g4.conjugate()
     for g in prange(nstates):  # pylint: disable=not-an-iterable
         i = ((g >> m1) << (m1 + 1)) + (g & (tk1 - 1))
         i = ((i >> m2) << (m2 + 1)) + (i & (tk2 - 1))
         i1, i2 = i + uk1, i + uk2
         i3 = i + tk1 + tk2
-        state[i1], state[i2] = (
-            gate[0] * state[i1] + gate[1] * state[i2],
-            gate[2] * state[i1] + gate[3] * state[i2],
-        )
-        state[i3] *= gate[4]
+        s1, s2 = state[i1], state[i2]
+        state[i1] = g0 * s1 + g1 * s2
+        state[i2] = g2 * s1 + g3 * s2
+        state[i3] *= g4
     return state
 
 
 @njit(
     [
-        "complex64[:](complex64[:], complex64[:], int32[:], int64, int64, int64, boolean)",
-        "complex128[:](complex128[:], complex128[:], int32[:], int64, int64, int64, boolean)",
+        "complex64[:](complex64[:], complex64[:], int32[:], int64, int64, int64, boolean, boolean)",
+        "complex128[:](complex128[:], complex128[:], int32[:], int64, int64, int64, boolean, boolean)",
     ],
     parallel=True,
     cache=True,
 )
 def multicontrol_apply_fsim_kernel(
-    state, gate, qubits, nstates, m1, m2, swap_targets=False
+    state, gate, qubits, nstates, m1, m2, swap_targets=False, conj=False
 ):
     tk1, tk2 = 1 << m1, 1 << m2
     uk1, uk2 = tk1, tk2
     if swap_targets:
         uk1, uk2 = uk2, uk1
+    g0, g1, g2, g3, g4 = gate[0], gate[1], gate[2], gate[3], gate[4]
+    if conj:
+        g0, g1, g2 = g0.conjugate(), g1.conjugate(), g2.conjugate()
+        g3, g4 = g3.conjugate(), g4.conjugate()
     for g in prange(nstates):  # pylint: disable=not-an-iterable
         i = multicontrol_index(g, qubits)
         i1, i2 = i - uk2, i - uk1
-        state[i1], state[i2] = (
-            gate[0] * state[i1] + gate[1] * state[i2],
-            gate[2] * state[i1] + gate[3] * state[i2],
-        )
-        state[i] *= gate[4]
+        s1, s2 = state[i1], state[i2]
+        state[i1] = g0 * s1 + g1 * s2
+        state[i2] = g2 * s1 + g3 * s2
+        state[i] *= g4
+    return state
+
+
+@njit(
+    [
+        "complex64[:](complex64[:], complex64[:,:], int64, int64, int64)",
+        "complex128[:](complex128[:], complex128[:,:], int64, int64, int64)",
+    ],
+    parallel=True,
+    fastmath=True,
+    cache=True,
+)
+def apply_gate_density_matrix_kernel(state, gate, nstates, m1, m2):
+    # applies ``gate`` to the row bit ``m2`` and its conjugate to the
+    # column bit ``m1`` of a flattened density matrix in a single pass
+    tk1, tk2 = 1 << m1, 1 << m2
+    g00, g01, g10, g11 = gate[0, 0], gate[0, 1], gate[1, 0], gate[1, 1]
+    c00, c01 = g00.conjugate(), g01.conjugate()
+    c10, c11 = g10.conjugate(), g11.conjugate()
+    for g in prange(nstates):  # pylint: disable=not-an-iterable
+        i = ((g >> m1) << (m1 + 1)) + (g & (tk1 - 1))
+        i = ((i >> m2) << (m2 + 1)) + (i & (tk2 - 1))
+        i1, i2 = i + tk1, i + tk2
+        i3 = i1 + tk2
+        s0, s1, s2, s3 = state[i], state[i1], state[i2], state[i3]
+        # rows
+        r0, r2 = g00 * s0 + g01 * s2, g10 * s0 + g11 * s2
+        r1, r3 = g00 * s1 + g01 * s3, g10 * s1 + g11 * s3
+        # columns
+        state[i] = c00 * r0 + c01 * r1
+        state[i1] = c10 * r0 + c11 * r1
+        state[i2] = c00 * r2 + c01 * r3
+        state[i3] = c10 * r2 + c11 * r3
     return state
 
 
@@ -19,14 +19,29 @@ __device__ long multicontrol_index(const int* qubits, long g, int ncontrols) {
 """  # pragma: no cover
 
 
-_apply_gate = """
+_load_gate = """
+// Read a gate element, conjugated if the kernel is compiled with -DCONJ
+__device__ T load_gate(const T* gate, int k) {
+#ifdef CONJ
+  return conj(gate[k]);
+#else
+  return gate[k];
+#endif
+}
+"""  # pragma: no cover
+
+
+_apply_gate = (
+    _load_gate
+    + """
 // Helper method for apply_gate_kernel()
 __device__ void _apply_gate(T& state1, T& state2, const T* gate) {
   const T buffer = state1;
-  state1 = gate[0] * state1 + gate[1] * state2;
-  state2 = gate[2] * buffer + gate[3] * state2;
+  state1 = load_gate(gate, 0) * state1 + load_gate(gate, 1) * state2;
+  state2 = load_gate(gate, 2) * buffer + load_gate(gate, 3) * state2;
 }
-"""  # pragma: no cover
+"""
+)  # pragma: no cover
 
 
 _apply_x = """
@@ -42,8 +57,14 @@ __device__ void _apply_x(T& state1, T& state2) {
 _apply_y = """
 // Helper method for apply_y_kernel()
 __device__ void _apply_y(T& state1, T& state2) {
+#ifdef CONJ
+  // the conjugate of Y is -Y
+  state1 = state1 * T(0, -1);
+  state2 = state2 * T(0, 1);
+#else
   state1 = state1 * T(0, 1);
   state2 = state2 * T(0, -1);
+#endif
   const T buffer = state1;
   state1 = state2;
   state2 = buffer;
@@ -59,42 +80,51 @@ __device__ void _apply_z(T& state) {
 """  # pragma: no cover
 
 
-_apply_z_pow = """
+_apply_z_pow = (
+    _load_gate
+    + """
 // Helper method for apply_z_pow_kernel()
-__device__ void _apply_z_pow(T& state, T gate) {
-  state = state * gate;
+__device__ void _apply_z_pow(T& state, const T* gate) {
+  state = state * load_gate(gate, 0);
 }
-"""  # pragma: no cover
+"""
+)  # pragma: no cover
 
 
-_apply_two_qubit_gate = """
+_apply_two_qubit_gate = (
+    _load_gate
+    + """
 // Helper method for apply_two_qubit_gate_kernel()
 __device__ void _apply_two_qubit_gate(T& state0, T& state1, T& state2, T& state3,
                                       const T* gate) {
   const T buffer0 = state0;
   const T buffer1 = state1;
   const T buffer2 = state2;
-  state0 = gate[0]  * state0  + gate[1]  * state1
-         + gate[2]  * state2  + gate[3]  * state3;
-  state1 = gate[4]  * buffer0 + gate[5]  * state1
-         + gate[6]  * state2  + gate[7]  * state3;
-  state2 = gate[8]  * buffer0 + gate[9]  * buffer1
-         + gate[10] * state2  + gate[11] * state3;
-  state3 = gate[12] * buffer0 + gate[13] * buffer1
-         + gate[14] * buffer2 + gate[15] * state3;
+  state0 = load_gate(gate, 0) * state0 + load_gate(gate, 1) * state1
+         + load_gate(gate, 2) * state2 + load_gate(gate, 3) * state3;
+  state1 = load_gate(gate, 4) * buffer0 + load_gate(gate, 5) * state1
+         + load_gate(gate, 6) * state2 + load_gate(gate, 7) * state3;
+  state2 = load_gate(gate, 8) * buffer0 + load_gate(gate, 9) * buffer1
+         + load_gate(gate, 10) * state2 + load_gate(gate, 11) * state3;
+  state3 = load_gate(gate, 12) * buffer0 + load_gate(gate, 13) * buffer1
+         + load_gate(gate, 14) * buffer2 + load_gate(gate, 15) * state3;
 }
-"""  # pragma: no cover
+"""
+)  # pragma: no cover
 
 
-_apply_fsim = """
+_apply_fsim = (
+    _load_gate
+    + """
 // Helper method for apply_fsim_kernel()
 __device__ void _apply_fsim(T& state1, T& state2, T& state3, const T* gate) {
   const T buffer = state1;
-  state1 = gate[0] * state1 + gate[1] * state2;
-  state2 = gate[2] * buffer + gate[3] * state2;
-  state3 = gate[4] * state3;
+  state1 = load_gate(gate, 0) * state1 + load_gate(gate, 1) * state2;
+  state2 = load_gate(gate, 2) * buffer + load_gate(gate, 3) * state2;
+  state3 = load_gate(gate, 4) * state3;
 }
-"""  # pragma: no cover
+"""
+)  # pragma: no cover
 
 
 multitarget_index = """
@@ -200,7 +230,7 @@ __global__ void apply_z_pow_kernel(T* state, long tk, int m,
                                    const T* gate) {
   const long g = blockIdx.x * blockDim.x + threadIdx.x;
   const long i = ((long)((long)g >> m) << (m + 1)) + (g & (tk - 1));
-  _apply_z_pow(state[i + tk], gate[0]);
+  _apply_z_pow(state[i + tk], gate);
 }
 """
 )  # pragma: no cover
@@ -266,6 +296,58 @@ __global__ void apply_swap_kernel(T* state, long tk1, long tk2,
 )  # pragma: no cover
 
 
+apply_multi_swap_kernel = (
+    f"""
+#include <cupy/complex.cuh>
+{_apply_x}"""
+    + """
+// C++ implementation of gates.py:apply_multi_swap_kernel()
+extern "C"
+__global__ void apply_multi_swap_kernel(T* state, const int* targets, int npairs) {
+  const long i = blockIdx.x * blockDim.x + threadIdx.x;
+  long j = i;
+  for (auto p = 0; p < npairs; p++) {
+    const int m1 = targets[2 * p];
+    const int m2 = targets[2 * p + 1];
+    const long flip = ((long)(i >> m1) ^ (long)(i >> m2)) & 1;
+    j ^= flip * (((long)1 << m1) | ((long)1 << m2));
+  }
+  if (j > i) {
+    _apply_x(state[i], state[j]);
+  }
+}
+"""
+)  # pragma: no cover
+
+
+apply_gate_density_matrix_kernel = """
+#include <cupy/complex.cuh>
+
+// C++ implementation of gates.py:apply_gate_density_matrix_kernel()
+extern "C"
+__global__ void apply_gate_density_matrix_kernel(T* state, long tk1, long tk2,
+                                                 int m1, int m2, const T* gate) {
+  const long g = blockIdx.x * blockDim.x + threadIdx.x;
+  long i = ((long)((long)g >> m1) << (m1 + 1)) + (g & (tk1 - 1));
+  i = ((long)((long)i >> m2) << (m2 + 1)) + (i & (tk2 - 1));
+  const T s0 = state[i];
+  const T s1 = state[i + tk1];
+  const T s2 = state[i + tk2];
+  const T s3 = state[i + tk1 + tk2];
+  // rows
+  const T r0 = gate[0] * s0 + gate[1] * s2;
+  const T r1 = gate[0] * s1 + gate[1] * s3;
+  const T r2 = gate[2] * s0 + gate[3] * s2;
+  const T r3 = gate[2] * s1 + gate[3] * s3;
+  // columns
+  state[i] = conj(gate[0]) * r0 + conj(gate[1]) * r1;
+  state[i + tk1] = conj(gate[2]) * r0 + conj(gate[3]) * r1;
+  state[i + tk2] = conj(gate[0]) * r2 + conj(gate[1]) * r3;
+  state[i + tk1 + tk2] = conj(gate[2]) * r2 + conj(gate[3]) * r3;
+}
+"""  # pragma: no cover
+
+
 multicontrol_apply_gate_kernel = (
     f"""
 #include <cupy/complex.cuh>
@@ -351,7 +433,7 @@ __global__ void multicontrol_apply_z_pow_kernel(T* state, long tk, int m,
                                                 const int* qubits, int ncontrols) {
   const long g = blockIdx.x * blockDim.x + threadIdx.x;
   const long i = multicontrol_index(qubits, g, ncontrols);
-  _apply_z_pow(state[i], gate[0]);
+  _apply_z_pow(state[i], gate);
 }
 """
 )  # pragma: no cover
@@ -446,6 +528,18 @@ apply_multi_qubit_gate_kernel(T* state,
                               const long* targets,
                               int ntargets,
                               int ncontrols) {
+#ifdef SHARED_MEM
+  // all threads of the block read the whole gate, so it is loaded once
+  // to shared memory. raw storage is used because __shared__ variables
+  // cannot have constructors
+  __shared__ __align__(16) char gate_buffer[nsubstates * nsubstates * sizeof(T)];
+  T* shared_gate = reinterpret_cast<T*>(gate_buffer);
+  for (long k = threadIdx.x; k < nsubstates * nsubstates; k += blockDim.x) {
+    shared_gate[k] = gate[k];
+  }
+  __syncthreads();
+  gate = shared_gate;
+#endif
   const long g = blockIdx.x * blockDim.x + threadIdx.x;
   const long ig = multicontrol_index(qubits, g, ncontrols);
   T buffer[nsubstates];
@@ -494,10 +588,13 @@ initial_state_kernel = """
 #include <cupy/complex.cuh>
 
 // C++ implementation of ops.py:initial_state_vector()
-// In contrast to the Python method, the state is inizialized
-// to zero in backends.py:CupyBackend.initial_state, then a
-// single thread execute this kernel and set the first element to 1
-extern "C" __global__ void initial_state_kernel(T* state) {
-  state[0] = T(1, 0);
+// States are allocated uninitialized in backends.py:CupyBackend.zero_state
+// and each thread writes one element, so that zeroing the state and setting
+// the first element to 1 take a single launch
+extern "C" __global__ void initial_state_kernel(T* state, long size) {
+  const long g = blockIdx.x * blockDim.x + threadIdx.x;
+  if (g < size) {
+    state[g] = g == 0 ? T(1, 0) : T(0, 0);
+  }
 }
 """  # pragma: no cover
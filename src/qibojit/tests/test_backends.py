@@ -20,6 +20,72 @@ def test_thread_setter(backend):
     assert numba.get_num_threads() == 1
 
 
+@pytest.mark.parametrize("numa_policy", ["local", "interleave"])
+def test_thread_setter_numa(backend, numa_policy):
+    import ctypes
+    import ctypes.util
+    import os
+    import sys
+
+    import numba
+
+    if sys.platform != "linux":  # pragma: no cover
+        pytest.skip("NUMA policies are only supported on Linux.")
+    if numa_policy == "interleave" and ctypes.util.find_library("numa") is None:
+        pytest.skip("libnuma is required for interleaved states.")  # pragma: no cover
+
+    from qibojit.backends.numa import numa_policy as active_policy
+
+    affinity = os.sched_getaffinity(0)
+    nthreads = numba.get_num_threads()
+    try:
+        backend.set_threads(1, numa_policy=numa_policy)
+        assert numba.get_num_threads() == 1
+        assert len(os.sched_getaffinity(0)) == 1
+        state = backend.zero_state(3)
+        backend.assert_allclose(state, np.eye(8)[0])
+        # creating another backend keeps the threads pinned and the policy
+        other = backend.__class__()
+        assert len(os.sched_getaffinity(0)) == 1
+        assert active_policy() == numa_policy
+        # pinned threads are selected from the original affinity
+        backend.set_threads(nthreads, numa_policy=numa_policy)
+        assert len(os.sched_getaffinity(0)) == min(nthreads, len(affinity))
+        if numa_policy == "interleave":
+            libnuma = ctypes.CDLL(ctypes.util.find_library("numa"))
+            state = other.zero_state(12)
+            mode = ctypes.c_int()
+            # MPOL_F_ADDR = 2, MPOL_INTERLEAVE = 3
+            libnuma.get_mempolicy(
+                ctypes.byref(mode), None, 0, ctypes.c_void_p(state.ctypes.data), 2
+            )
+            assert mode.value == 3
+    finally:
+        backend.set_threads(nthreads)
+    assert os.sched_getaffinity(0) == affinity
+    assert active_policy() is None
+
+
+def test_thread_setter_numa_errors(backend):
+    with pytest.raises(ValueError):
+        backend.set_threads(1, numa_policy="test")
+
+
+def test_balanced_cpus():
+    import os
+    import sys
+
+    if sys.platform != "linux":  # pragma: no cover
+        pytest.skip("NUMA policies are only supported on Linux.")
+
+    from qibojit.backends.numa import _parse_cpulist, balanced_cpus
+
+    assert _parse_cpulist("0-3,8,10-11\n") == [0, 1, 2, 3, 8, 10, 11]
+    cpus = balanced_cpus(2)
+    assert len(cpus) == min(2, len(os.sched_getaffinity(0)))
+    assert set(cpus) <= os.sched_getaffinity(0)
+
+
 @pytest.mark.parametrize("array_type", [None, "float32", "float64"])
 def test_cast(backend, array_type):
     target = np.random.random(10)
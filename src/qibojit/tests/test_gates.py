@@ -22,6 +22,7 @@ ATOL = {"complex64": 1e-4, "complex128": 1e-10}
         (4, 2, []),
         (3, 0, []),
         (8, 5, []),
+        (10, 9, []),
         (3, 0, [1, 2]),
         (4, 3, [0, 1, 2]),
         (5, 3, [1]),
@@ -136,7 +137,9 @@ def test_apply_two_qubit_gate(
     backend.assert_allclose(state, target_state, atol=ATOL.get(dtype))
 
 
-@pytest.mark.parametrize(("nqubits", "targets"), [(5, [3, 4]), (4, [2, 0])])
+@pytest.mark.parametrize(
+    ("nqubits", "targets"), [(5, [3, 4]), (4, [2, 0]), (10, [9, 8])]
+)
 @pytest.mark.parametrize("use_qubits", [False, True])
 def test_apply_two_qubit_base(backend, nqubits, targets, use_qubits, dtype):
     state = random_statevector(2**nqubits).astype(dtype)
@@ -155,6 +158,52 @@ def test_apply_two_qubit_base(backend, nqubits, targets, use_qubits, dtype):
     backend.assert_allclose(state, target_state, atol=ATOL.get(dtype))
 
 
+@pytest.mark.parametrize(("nqubits", "target"), [(1, 0), (3, 0), (3, 2), (4, 1)])
+def test_one_qubit_density_matrix_base(backend, nqubits, target, dtype):
+    state = random_density_matrix(2**nqubits).astype(dtype)
+    matrix = random_complex((2, 2), dtype=dtype)
+    gate = gates.Unitary(matrix, target)
+
+    tbackend = NumpyBackend()
+    set_precision(dtype, backend, tbackend)
+    target_state = tbackend.apply_gate_density_matrix(gate, np.copy(state), nqubits)
+    state = backend.cast(state)
+    matrix = backend.cast(matrix)
+    state = backend.one_qubit_density_matrix_base(
+        state.ravel(), nqubits, target, matrix
+    )
+    state = backend.np.reshape(state, 2 * (2**nqubits,))
+    backend.assert_allclose(state, target_state, atol=ATOL.get(dtype))
+
+
+@pytest.mark.parametrize(
+    ("nqubits", "target", "controls"), [(1, 0, []), (3, 1, []), (4, 0, [2, 3])]
+)
+def test_apply_ygate_density_matrix(backend, nqubits, target, controls, dtype):
+    state = random_density_matrix(2**nqubits).astype(dtype)
+    gate = gates.Y(target).controlled_by(*controls)
+
+    tbackend = NumpyBackend()
+    set_precision(dtype, backend, tbackend)
+    target_state = tbackend.apply_gate_density_matrix(gate, np.copy(state), nqubits)
+    state = backend.apply_gate_density_matrix(gate, np.copy(state), nqubits)
+    backend.assert_allclose(state, target_state, atol=ATOL.get(dtype))
+
+
+def test_apply_gate_density_matrix_non_contiguous(backend, dtype):
+    nqubits = 3
+    # transposed arrays are not C-contiguous and cannot be flattened in place
+    state = random_density_matrix(2**nqubits).astype(dtype).T
+    gate = gates.Unitary(random_unitary(2**2), 0, 2)
+
+    tbackend = NumpyBackend()
+    set_precision(dtype, backend, tbackend)
+    target_state = tbackend.apply_gate_density_matrix(gate, np.copy(state), nqubits)
+    state = backend.apply_gate_density_matrix(gate, backend.cast(state), nqubits)
+    assert state.shape == 2 * (2**nqubits,)
+    backend.assert_allclose(state, target_state, atol=ATOL.get(dtype))
+
+
 @pytest.mark.parametrize(
     ("nqubits", "targets", "controls"),
     [
@@ -289,6 +338,265 @@ def test_apply_multi_qubit_base(backend, nqubits, targets, use_qubits, dtype):
     backend.assert_allclose(state, target_state, atol=ATOL.get(dtype))
 
 
+@pytest.mark.parametrize("nqubits", [2, 4, 6])
+@pytest.mark.parametrize("max_qubits", [1, 2, 4])
+@pytest.mark.parametrize("unfused", [None, "measurement", "channel", "callback"])
+def test_apply_gates(backend, nqubits, max_qubits, unfused, dtype):
+    from qibo import callbacks
+
+    state = random_statevector(2**nqubits).astype(dtype)
+    queue = []
+    for q in range(nqubits):
+        queue.append(gates.H(q))
+        queue.append(gates.RX(q, theta=0.1 * (q + 1)))
+    for q in range(nqubits - 1):
+        queue.append(gates.CNOT(q, q + 1))
+        queue.append(gates.fSim(q, q + 1, theta=0.1, phi=0.2))
+    queue.append(gates.Y(0).controlled_by(nqubits - 1))
+    if unfused == "measurement":
+        queue.append(gates.M(0, collapse=False))
+    elif unfused == "channel":
+        # the channel always applies X, so that the final state is deterministic
+        queue.append(gates.PauliNoiseChannel([0], [("X", 1.0)]))
+    elif unfused == "callback":
+        queue.append(gates.CallbackGate(callbacks.Norm()))
+    queue.append(gates.SWAP(0, nqubits - 1))
+    queue.extend(gates.SWAP(q, nqubits - q - 1) for q in range(1, nqubits // 2))
+    queue.append(gates.Unitary(random_unitary(2**2), nqubits - 1, 0))
+
+    tbackend = NumpyBackend()
+    set_precision(dtype, backend, tbackend)
+    target_state = np.copy(state)
+    for gate in queue:
+        target_state = gate.apply(tbackend, target_state, nqubits)
+    backend.MAX_FUSE_QUBITS = max_qubits
+    state = backend.apply_gate(queue, np.copy(state), nqubits)
+    backend.assert_allclose(state, target_state, atol=ATOL.get(dtype))
+
+
+@pytest.mark.parametrize("max_qubits", [2, 3])
+def test_apply_gates_parameter_update(backend, max_qubits):
+    nqubits = 4
+    queue = [gates.H(q) for q in range(nqubits)]
+    queue.extend(gates.RY(q, theta=0.1) for q in range(nqubits))
+    queue.extend(gates.CNOT(q + 1, q) for q in range(nqubits - 1))
+    queue.append(gates.Unitary(random_unitary(2**2), 2, 1))
+    backend.MAX_FUSE_QUBITS = max_qubits
+
+    tbackend = NumpyBackend()
+    for theta in [0.1, 0.2, 0.2]:
+        for gate in queue[nqubits : 2 * nqubits]:
+            gate.parameters = theta
+        queue[-1].parameters = random_unitary(2**2)
+        target_state = tbackend.zero_state(nqubits)
+        for gate in queue:
+            target_state = tbackend.apply_gate(gate, target_state, nqubits)
+        # the fusion of the sequence is reused by each call
+        state = backend.apply_gates(queue, backend.zero_state(nqubits), nqubits)
+        backend.assert_allclose(state, target_state)
+    assert len(backend._fusion_cache) == 1
+
+
+def test_compile_circuit(backend):
+    if backend.platform == "cuquantum":
+        pytest.skip("Circuit compilation is not available for cuquantum backend.")
+    nqubits = 5
+    queue = [gates.H(q) for q in range(nqubits)]
+    queue.extend(gates.CZ(q, q + 1) for q in range(nqubits - 1))
+    queue.append(gates.RY(0, theta=0.1).controlled_by(3))
+    queue.append(gates.Unitary(random_unitary(2**3), 1, 2, 4))
+    circuit = backend.compile_circuit(queue, nqubits)
+
+    tbackend = NumpyBackend()
+    initial_state = random_statevector(2**nqubits)
+    for theta in [0.1, 0.2]:
+        queue[-2].parameters = theta
+        target_state = tbackend.zero_state(nqubits)
+        final_state = np.copy(initial_state)
+        for gate in queue:
+            target_state = tbackend.apply_gate(gate, target_state, nqubits)
+            final_state = tbackend.apply_gate(gate, final_state, nqubits)
+        backend.assert_allclose(circuit(), target_state)
+        backend.assert_allclose(circuit(np.copy(initial_state)), final_state)
+
+
+def test_compile_circuit_parameter_update(backend):
+    if backend.platform != "numba":
+        pytest.skip("Dense circuits are only used by numba backend.")
+    nqubits = 3
+    queue = [gates.RX(q, theta=0.1) for q in range(nqubits)]
+    queue.append(gates.FusedGate(0, 1))
+    queue[-1].append(gates.CZ(0, 1))
+    queue[-1].append(gates.RY(1, theta=0.2))
+    circuit = backend.compile_circuit(queue, nqubits)
+    unitary = circuit.unitary
+
+    tbackend = NumpyBackend()
+    for gate in [queue[0], queue[-1].gates[-1]]:
+        gate.parameters = 0.3
+        target_state = tbackend.zero_state(nqubits)
+        for g in queue:
+            target_state = tbackend.apply_gate(g, target_state, nqubits)
+        # gates are applied one by one until parameters are stable
+        backend.assert_allclose(circuit(), target_state)
+        assert circuit.unitary is unitary
+        backend.assert_allclose(circuit(), target_state)
+        assert circuit.unitary is not unitary
+        unitary = circuit.unitary
+        backend.assert_allclose(circuit(), target_state)
+        assert circuit.unitary is unitary
+
+
+def test_compile_circuit_errors(backend):
+    if backend.platform != "numba":
+        pytest.skip("Dense circuits are only used by numba backend.")
+    with pytest.raises(ValueError):
+        backend.compile_circuit([gates.H(0)], backend.DENSE_MAX_QUBITS + 1)
+    with pytest.raises(ValueError):
+        backend.compile_circuit([gates.H(0), gates.M(0)], 2)
+
+
+def test_gate_fuser():
+    from qibojit.backends.fusion import GateFuser
+
+    queue = [
+        gates.H(0),
+        gates.H(1),
+        gates.CNOT(0, 1),
+        gates.H(2).controlled_by(0),
+        gates.H(2),
+        gates.CZ(2, 3),
+        gates.H(4),
+    ]
+    fused = GateFuser(max_qubits=2).fuse(queue)
+    assert len(fused) == 4
+    assert fused[0].__class__.__name__ == "FusedGate"
+    assert fused[0].gates == queue[:3]
+    assert fused[1] is queue[3]
+    assert fused[2].gates == queue[4:6]
+    assert fused[3] is queue[6]
+
+    queue = [
+        gates.H(0),
+        gates.SWAP(0, 3),
+        gates.SWAP(1, 2),
+        gates.SWAP(3, 4),
+        gates.SWAP(1, 0).controlled_by(2),
+    ]
+    fused = GateFuser(max_qubits=2).fuse(queue)
+    assert len(fused) == 4
+    assert fused[0] is queue[0]
+    assert fused[1].pairs == ((0, 3), (1, 2))
+    assert fused[2] is queue[3]
+    assert fused[3] is queue[4]
+
+
+@pytest.mark.parametrize(
+    ("nqubits", "pairs"),
+    [
+        (2, [(0, 1)]),
+        (4, [(0, 3), (1, 2)]),
+        (5, [(4, 0), (1, 3)]),
+        (6, [(0, 5), (2, 1), (3, 4)]),
+    ],
+)
+def test_multi_swap_base(backend, nqubits, pairs, dtype):
+    state = random_statevector(2**nqubits).astype(dtype)
+    tbackend = NumpyBackend()
+    set_precision(dtype, backend, tbackend)
+    target_state = np.copy(state)
+    for pair in pairs:
+        target_state = tbackend.apply_gate(gates.SWAP(*pair), target_state, nqubits)
+    state = backend.multi_swap_base(backend.cast(state), nqubits, pairs)
+    backend.assert_allclose(state, target_state, atol=ATOL.get(dtype))
+
+
+def test_specialized_kernels(backend, dtype):
+    if backend.platform != "numba":
+        pytest.skip("Kernel specialization is only available for numba.")
+    nqubits = 4
+    state = random_statevector(2**nqubits).astype(dtype)
+    matrix = random_unitary(2).astype(dtype)
+    gatelist = [gates.Unitary(matrix, q) for q in range(nqubits)]
+
+    tbackend = NumpyBackend()
+    set_precision(dtype, backend, tbackend)
+    target_state = np.copy(state)
+    backend.SPECIALIZE_KERNELS = True
+    try:
+        for gate in gatelist:
+            target_state = tbackend.apply_gate(gate, target_state, nqubits)
+            state = backend.apply_gate(gate, state, nqubits)
+    finally:
+        backend.SPECIALIZE_KERNELS = False
+    backend.assert_allclose(state, target_state, atol=ATOL.get(dtype))
+    # one kernel was compiled for each target
+    for m in range(nqubits):
+        assert ("apply_gate", m, nqubits) in backend._kernel_cache
+    kernel = backend.specialized_kernel("apply_gate", 1, nqubits)
+    assert backend.specialized_kernel("apply_gate", 1, nqubits) is kernel
+
+
+def test_qubits_tensor_cache(backend):
+    qubits = backend._create_qubits_tensor(gates.H(1).controlled_by(0), 3)
+    assert backend._create_qubits_tensor(gates.Y(1).controlled_by(0), 3) is qubits
+    assert backend._create_qubits_tensor(gates.H(1), 3) is not qubits
+    backend.assert_allclose(qubits, qubits_tensor(3, [1], [0]))
+    targets = backend._create_targets_tensor((0, 2), 3)
+    assert backend._create_targets_tensor((0, 2), 3) is targets
+    backend.assert_allclose(targets, [1, 4])
+
+
+@pytest.mark.parametrize(
+    "gate",
+    [
+        gates.H(1),
+        gates.X(2).controlled_by(0),
+        gates.Y(1),
+        gates.Y(0).controlled_by(1, 2),
+        gates.U1(2, theta=0.1234),
+        gates.CU1(0, 2, theta=0.1234),
+        gates.RXX(0, 2, theta=0.1234),
+        gates.SWAP(1, 2),
+        gates.fSim(2, 0, theta=0.1234, phi=0.4321),
+        gates.fSim(2, 1, theta=0.1234, phi=0.4321).controlled_by(0),
+        gates.TOFFOLI(0, 1, 2),
+        gates.Unitary(random_unitary(2**3), 0, 1, 2),
+    ],
+)
+def test_conjugate_kernels(backend, gate, dtype):
+    from qibojit.backends.cpu import GATE_OPS
+
+    nqubits = 3
+    state = random_statevector(2**nqubits).astype(dtype)
+    tbackend = NumpyBackend()
+    set_precision(dtype, backend, tbackend)
+    # the conjugate gate acts as ``conj(G) s = conj(G conj(s))``
+    target_state = tbackend.apply_gate(gate, np.conj(state), nqubits)
+    target_state = np.conj(target_state)
+
+    name = gate.__class__.__name__
+    matrix = backend._as_custom_matrix(gate)
+    qubits = backend._create_qubits_tensor(gate, nqubits)
+    targets = gate.target_qubits
+    state = backend.cast(state)
+    if len(targets) == 1:
+        op = GATE_OPS.get(name, "apply_gate")
+        state = backend.one_qubit_base(
+            state, nqubits, *targets, op, matrix, qubits, conj=True
+        )
+    elif len(targets) == 2:
+        op = GATE_OPS.get(name, "apply_two_qubit_gate")
+        state = backend.two_qubit_base(
+            state, nqubits, *targets, op, matrix, qubits, conj=True
+        )
+    else:
+        state = backend.multi_qubit_base(
+            state, nqubits, targets, matrix, qubits, conj=True
+        )
+    backend.assert_allclose(state, target_state, atol=ATOL.get(dtype))
+
+
 @pytest.mark.parametrize("gatename", ["H", "X", "Y", "Z"])
 @pytest.mark.parametrize("density_matrix", [False, True])
 def test_gates_on_circuit(backend, gatename, density_matrix):
@@ -361,7 +669,46 @@ def test_unitary_channel(backend, dtype):
     set_precision(dtype, backend, tbackend)
     target_state = tbackend.apply_channel_density_matrix(channel, np.copy(state), 4)
     final_state = backend.apply_channel_density_matrix(channel, np.copy(state), 4)
+    backend.assert_allclose(final_state, target_state, atol=ATOL.get(dtype))
+
+
+def test_pauli_noise_channel(backend, dtype):
+    tbackend = NumpyBackend()
+    channel = gates.PauliNoiseChannel([1, 2], [("X", 0.1), ("Y", 0.2), ("Z", 0.3)])
+    state = random_density_matrix(2**3).astype(dtype)
+
+    set_precision(dtype, backend, tbackend)
+    target_state = tbackend.apply_channel_density_matrix(channel, np.copy(state), 3)
+    final_state = backend.apply_channel_density_matrix(channel, np.copy(state), 3)
+    backend.assert_allclose(final_state, target_state, atol=ATOL.get(dtype))
+
+
+@pytest.mark.parametrize("x_dtype", ["complex64", "complex128"])
+@pytest.mark.parametrize("y_dtype", ["complex64", "complex128"])
+@pytest.mark.parametrize("transpose", [False, True])
+def test_axpy(backend, x_dtype, y_dtype, transpose):
+    x = random_complex((4, 4), dtype=x_dtype)
+    y = random_complex((4, 4), dtype=y_dtype)
+    if transpose:
+        y = y.T
+    target = y + 0.3 * x
+    y = backend.cast(y, dtype=y_dtype)
+    result = backend._axpy(0.3, backend.cast(x, dtype=x_dtype), y)
+    assert result is y
+    backend.assert_allclose(y, target, atol=ATOL.get(y_dtype))
+
+
+def test_channel_density_matrix_non_contiguous(backend):
+    tbackend = NumpyBackend()
+    channel = gates.PauliNoiseChannel([0, 2], [("X", 0.1), ("Z", 0.3)])
+    state = random_density_matrix(2**3).T
+    initial_state = np.copy(state)
+
+    target_state = tbackend.apply_channel_density_matrix(channel, np.copy(state), 3)
+    final_state = backend.apply_channel_density_matrix(channel, backend.cast(state), 3)
     backend.assert_allclose(final_state, target_state)
+    # the terms of the channel are applied to a copy of the state
+    backend.assert_allclose(state, initial_state)
 
 
 def test_readout_error_channel(backend):